@@ -1,10 +1,48 @@
 """Bookmaker-specific analysis."""
-from typing import Dict, List
+from typing import Any, Dict, NamedTuple, Optional
+from sqlalchemy import case, func
 from database.db import get_db
-from database.models import Bet, Odds
+from database.models import Bet, Match, Odds
 from utils.helpers import calculate_roi
 
 
+# Per-bookmaker aggregates, in the argument order of
+# BookmakerAnalyzer._calculate_bookmaker_stats
+_STATS_COLUMNS = (
+    func.count(Bet.id),
+    func.sum(case((Bet.status == "won", 1), else_=0)),
+    func.sum(Bet.stake),
+    func.sum(Bet.profit),
+    func.avg(Bet.odds),
+    func.avg(Bet.edge),
+    func.avg(Bet.clv),
+)
+
+_SETTLED_FILTER = (
+    Bet.confirmed == True,
+    Bet.status.in_(["won", "lost"]),
+)
+
+
+class BookmakerStats(NamedTuple):
+    """Performance statistics of one bookmaker."""
+    
+    total_bets: int
+    won_bets: int
+    lost_bets: int
+    win_rate: float
+    avg_odds: float
+    avg_edge: float
+    avg_clv: float
+    total_stake: float
+    total_profit: float
+    roi: float
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access, kept for callers that treated stats as dicts."""
+        return getattr(self, key, default)
+
+
 class BookmakerAnalyzer:
     """Analyze performance by bookmaker."""
     
@@ -15,59 +53,57 @@ class BookmakerAnalyzer:
         """Analyze bets by bookmaker.
         
         Returns:
-            Dictionary with analysis for each bookmaker
+            Dictionary mapping each bookmaker to its BookmakerStats
         """
-        results = {}
-        
         with get_db() as db:
-            bets = db.query(Bet).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"])
-            ).all()
-            
-            bookmakers = set(b.bookmaker for b in bets)
-            
-            for bookmaker in bookmakers:
-                bm_bets = [b for b in bets if b.bookmaker == bookmaker]
-                results[bookmaker] = self._calculate_bookmaker_stats(bm_bets)
+            rows = db.query(Bet.bookmaker, *_STATS_COLUMNS).filter(
+                *_SETTLED_FILTER
+            ).group_by(Bet.bookmaker).all()
         
-        return results
+        return {
+            bookmaker: self._calculate_bookmaker_stats(*aggregates)
+            for bookmaker, *aggregates in rows
+        }
     
-    def _calculate_bookmaker_stats(self, bets: List[Bet]) -> Dict:
-        """Calculate statistics for a bookmaker.
+    def _calculate_bookmaker_stats(
+        self,
+        total_bets: int,
+        won_bets: int,
+        total_stake: Optional[float],
+        total_profit: Optional[float],
+        avg_odds: float,
+        avg_edge: float,
+        avg_clv: Optional[float],
+    ) -> BookmakerStats:
+        """Build statistics for a bookmaker from its SQL aggregates.
         
         Args:
-            bets: List of bets with this bookmaker
+            total_bets: Number of settled bets
+            won_bets: Number of won bets
+            total_stake: Sum of stakes
+            total_profit: Sum of profits
+            avg_odds: Mean odds
+            avg_edge: Mean edge
+            avg_clv: Mean CLV over bets that have one (None if no bet has)
             
         Returns:
-            Statistics dictionary
+            Bookmaker statistics
         """
-        if not bets:
-            return {}
-        
-        total_stake = sum(b.stake for b in bets)
-        total_profit = sum(b.profit for b in bets)
-        won_bets = sum(1 for b in bets if b.status == "won")
-        
-        avg_odds = sum(b.odds for b in bets) / len(bets)
-        avg_edge = sum(b.edge for b in bets) / len(bets)
+        total_stake = total_stake or 0.0
+        total_profit = total_profit or 0.0
         
-        # CLV stats
-        bets_with_clv = [b for b in bets if b.clv is not None]
-        avg_clv = sum(b.clv for b in bets_with_clv) / len(bets_with_clv) if bets_with_clv else 0.0
-        
-        return {
-            "total_bets": len(bets),
-            "won_bets": won_bets,
-            "lost_bets": len(bets) - won_bets,
-            "win_rate": won_bets / len(bets),
-            "avg_odds": avg_odds,
-            "avg_edge": avg_edge,
-            "avg_clv": avg_clv,
-            "total_stake": total_stake,
-            "total_profit": total_profit,
-            "roi": calculate_roi(total_profit, total_stake),
-        }
+        return BookmakerStats(
+            total_bets=total_bets,
+            won_bets=won_bets,
+            lost_bets=total_bets - won_bets,
+            win_rate=won_bets / total_bets,
+            avg_odds=avg_odds,
+            avg_edge=avg_edge,
+            avg_clv=avg_clv if avg_clv is not None else 0.0,
+            total_stake=total_stake,
+            total_profit=total_profit,
+            roi=calculate_roi(total_profit, total_stake),
+        )
     
     def compare_opening_closing_odds(self, bookmaker: str) -> Dict:
         """Compare opening and closing odds for a bookmaker.
@@ -79,21 +115,26 @@ class BookmakerAnalyzer:
             Comparison statistics
         """
         with get_db() as db:
-            opening_odds = db.query(Odds).filter(
-                Odds.bookmaker == bookmaker,
-                Odds.is_opening == True
-            ).all()
-            
-            closing_odds = db.query(Odds).filter(
+            (
+                total_opening,
+                total_closing,
+                sum_opening_team1,
+                sum_closing_team1,
+            ) = db.query(
+                func.count(case((Odds.is_opening == True, 1))),
+                func.count(case((Odds.is_closing == True, 1))),
+                func.sum(case((Odds.is_opening == True, Odds.team1_odds))),
+                func.sum(case((Odds.is_closing == True, Odds.team1_odds))),
+            ).filter(
                 Odds.bookmaker == bookmaker,
-                Odds.is_closing == True
-            ).all()
+                (Odds.is_opening == True) | (Odds.is_closing == True)
+            ).one()
             
             return {
-                "total_opening": len(opening_odds),
-                "total_closing": len(closing_odds),
-                "avg_opening_team1": sum(o.team1_odds for o in opening_odds if o.team1_odds) / len(opening_odds) if opening_odds else 0,
-                "avg_closing_team1": sum(o.team1_odds for o in closing_odds if o.team1_odds) / len(closing_odds) if closing_odds else 0,
+                "total_opening": total_opening,
+                "total_closing": total_closing,
+                "avg_opening_team1": (sum_opening_team1 or 0) / total_opening if total_opening else 0,
+                "avg_closing_team1": (sum_closing_team1 or 0) / total_closing if total_closing else 0,
             }
     
     def get_best_bookmaker_by_game(self, game: str) -> Dict:
@@ -106,27 +147,32 @@ class BookmakerAnalyzer:
             Best bookmaker information
         """
         with get_db() as db:
-            bets = db.query(Bet).join(Bet.match).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"]),
-                Bet.match.has(game=game)
-            ).all()
-            
-            bookmakers = set(b.bookmaker for b in bets)
-            bookmaker_stats = {}
-            
-            for bookmaker in bookmakers:
-                bm_bets = [b for b in bets if b.bookmaker == bookmaker]
-                bookmaker_stats[bookmaker] = self._calculate_bookmaker_stats(bm_bets)
-            
-            if not bookmaker_stats:
-                return {}
-            
-            # Find bookmaker with best ROI
-            best_bm = max(bookmaker_stats.items(), key=lambda x: x[1].get("roi", 0))
+            best = self._best_bookmaker_query(db, game).first()
+        
+        if best is None:
+            return {}
+        
+        bookmaker, *aggregates = best
+        
+        return {
+            "game": game,
+            "best_bookmaker": bookmaker,
+            **self._calculate_bookmaker_stats(*aggregates)._asdict(),
+        }
+    
+    def _best_bookmaker_query(self, db, game: str):
+        """Build the query ranking bookmakers of a game by ROI.
+        
+        Args:
+            db: Database session
+            game: Game name
             
-            return {
-                "game": game,
-                "best_bookmaker": best_bm[0],
-                **best_bm[1],
-            }
+        Returns:
+            Query yielding (bookmaker, *aggregates) rows, best ROI first
+        """
+        roi = func.coalesce(func.sum(Bet.profit) / func.nullif(func.sum(Bet.stake), 0), 0)
+        
+        return db.query(Bet.bookmaker, *_STATS_COLUMNS).join(Bet.match).filter(
+            *_SETTLED_FILTER,
+            Match.game == game,
+        ).group_by(Bet.bookmaker).order_by(roi.desc(), Bet.bookmaker).limit(1)
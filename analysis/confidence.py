@@ -1,68 +1,132 @@
 """Confidence-based analysis."""
-from typing import Dict, List
+from typing import Any, Dict, NamedTuple
+import numpy as np
 from config.constants import CONFIDENCE_RANGES
-from database.db import get_db
+from analysis.metrics.columns import load_bet_columns
 from database.models import Bet
 from utils.helpers import calculate_roi
 
 
+class RangeStats(NamedTuple):
+    """Performance statistics of one confidence range."""
+    
+    total_bets: int
+    won_bets: int
+    lost_bets: int
+    win_rate: float
+    avg_confidence: float
+    avg_odds: float
+    avg_edge: float
+    total_stake: float
+    total_profit: float
+    roi: float
+    
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style access, kept for callers that treated stats as dicts."""
+        return getattr(self, key, default)
+
+
 class ConfidenceAnalyzer:
     """Analyze betting performance by confidence ranges."""
     
     def __init__(self):
         self.confidence_ranges = CONFIDENCE_RANGES
+        # Range bounds for vectorized bucketing (ranges are sorted ascending)
+        self._range_lows = np.array([low for low, _ in self.confidence_ranges])
+        self._range_highs = np.array([high for _, high in self.confidence_ranges])
     
     def analyze_by_confidence(self) -> Dict:
         """Analyze bets by confidence ranges.
         
         Returns:
-            Dictionary with analysis for each confidence range
+            Dictionary mapping each confidence range to its RangeStats
         """
         results = {}
         
-        with get_db() as db:
-            bets = db.query(Bet).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"])
-            ).all()
-            
-            for low, high in self.confidence_ranges:
-                range_bets = [b for b in bets if low <= b.confidence < high]
-                
-                if range_bets:
-                    results[f"{low:.0%}-{high:.0%}"] = self._calculate_range_stats(range_bets)
+        columns = load_bet_columns(
+            Bet.confirmed == True,
+            Bet.status.in_(["won", "lost"]),
+            names=("confidence", "stake", "profit", "odds", "edge", "status"),
+        )
+        
+        confidence = columns["confidence"]
+        
+        n_ranges = len(self.confidence_ranges)
+        
+        # Assign every bet to its range in one pass; bets falling outside
+        # all ranges (or in a gap between them) go to an overflow bucket
+        # that is sliced off, so the columns are never compacted
+        bucket = np.searchsorted(self._range_lows, confidence, side="right") - 1
+        in_range = bucket >= 0
+        in_range[in_range] = confidence[in_range] < self._range_highs[bucket[in_range]]
+        bucket[~in_range] = n_ranges
+        
+        def bucket_sum(values: np.ndarray) -> np.ndarray:
+            weights = np.nan_to_num(values)
+            return np.bincount(bucket, weights=weights, minlength=n_ranges + 1)[:n_ranges]
+        
+        counts = np.bincount(bucket, minlength=n_ranges + 1)[:n_ranges]
+        won = bucket_sum(columns["status"] == "won")
+        stake_sums = bucket_sum(columns["stake"])
+        profit_sums = bucket_sum(columns["profit"])
+        confidence_sums = bucket_sum(confidence)
+        odds_sums = bucket_sum(columns["odds"])
+        edge_sums = bucket_sum(columns["edge"])
+        
+        for i, (low, high) in enumerate(self.confidence_ranges):
+            count = int(counts[i])
+            if count:
+                results[f"{low:.0%}-{high:.0%}"] = self._calculate_range_stats(
+                    count,
+                    int(won[i]),
+                    float(stake_sums[i]),
+                    float(profit_sums[i]),
+                    float(confidence_sums[i]) / count,
+                    float(odds_sums[i]) / count,
+                    float(edge_sums[i]) / count,
+                )
         
         return results
     
-    def _calculate_range_stats(self, bets: List[Bet]) -> Dict:
-        """Calculate statistics for a confidence range.
+    def _calculate_range_stats(
+        self,
+        total_bets: int,
+        won_bets: int,
+        total_stake: float,
+        total_profit: float,
+        avg_confidence: float,
+        avg_odds: float,
+        avg_edge: float,
+    ) -> RangeStats:
+        """Build statistics for a confidence range from its aggregates.
         
         Args:
-            bets: List of bets in the range
+            total_bets: Number of settled bets in the range
+            won_bets: Number of won bets in the range
+            total_stake: Sum of stakes
+            total_profit: Sum of profits
+            avg_confidence: Mean model confidence
+            avg_odds: Mean odds
+            avg_edge: Mean edge
             
         Returns:
-            Statistics dictionary
+            Range statistics
         """
-        total_stake = sum(b.stake for b in bets)
-        total_profit = sum(b.profit for b in bets)
-        won_bets = sum(1 for b in bets if b.status == "won")
+        total_stake = total_stake or 0.0
+        total_profit = total_profit or 0.0
         
-        avg_confidence = sum(b.confidence for b in bets) / len(bets)
-        avg_odds = sum(b.odds for b in bets) / len(bets)
-        avg_edge = sum(b.edge for b in bets) / len(bets)
-        
-        return {
-            "total_bets": len(bets),
-            "won_bets": won_bets,
-            "lost_bets": len(bets) - won_bets,
-            "win_rate": won_bets / len(bets),
-            "avg_confidence": avg_confidence,
-            "avg_odds": avg_odds,
-            "avg_edge": avg_edge,
-            "total_stake": total_stake,
-            "total_profit": total_profit,
-            "roi": calculate_roi(total_profit, total_stake),
-        }
+        return RangeStats(
+            total_bets=total_bets,
+            won_bets=won_bets,
+            lost_bets=total_bets - won_bets,
+            win_rate=won_bets / total_bets,
+            avg_confidence=avg_confidence,
+            avg_odds=avg_odds,
+            avg_edge=avg_edge,
+            total_stake=total_stake,
+            total_profit=total_profit,
+            roi=calculate_roi(total_profit, total_stake),
+        )
     
     def get_optimal_confidence_range(self) -> Dict:
         """Find the most profitable confidence range.
@@ -76,9 +140,9 @@ class ConfidenceAnalyzer:
             return {}
         
         # Find range with best ROI
-        best_range = max(analysis.items(), key=lambda x: x[1]["roi"])
+        best_range = max(analysis.items(), key=lambda x: x[1].roi)
         
         return {
             "range": best_range[0],
-            **best_range[1],
+            **best_range[1]._asdict(),
         }
@@ -1,12 +1,13 @@
 """Automatic insights generation from metrics."""
-from typing import Dict, List
-from dataclasses import dataclass
+import operator
+from typing import Callable, Dict, List, NamedTuple, Union
+from dataclasses import dataclass, replace
 from config.metrics_config import METRICS_THRESHOLDS, METRIC_COLORS
 
 
-@dataclass
+@dataclass(slots=True, frozen=True)
 class Insight:
-    """Represents a single insight."""
+    """Represents a single insight (immutable, so templates can be shared)."""
     type: str  # 'success', 'info', 'warning', 'danger'
     title: str
     description: str
@@ -14,379 +15,407 @@ class Insight:
     priority: int = 1  # 1=high, 2=medium, 3=low
 
 
-class InsightGenerator:
-    """Generate automated insights from metrics."""
-    
-    def __init__(self, metrics: Dict, thresholds: Dict = None):
-        """Initialize insight generator.
-        
-        Args:
-            metrics: Complete metrics dictionary from MetricsAggregator
-            thresholds: Custom thresholds (uses defaults if None)
-        """
-        self.metrics = metrics
-        self.thresholds = thresholds or METRICS_THRESHOLDS
-    
-    def generate_all_insights(self) -> List[Insight]:
-        """Generate all insights from metrics.
-        
-        Returns:
-            List of Insight objects, sorted by priority
-        """
-        insights = []
-        
-        # Performance insights
-        insights.extend(self._generate_performance_insights())
-        
-        # Risk insights
-        insights.extend(self._generate_risk_insights())
-        
-        # Calibration insights
-        insights.extend(self._generate_calibration_insights())
-        
-        # CLV insights
-        insights.extend(self._generate_clv_insights())
-        
-        # Streak insights
-        insights.extend(self._generate_streak_insights())
-        
-        # Bankroll insights
-        insights.extend(self._generate_bankroll_insights())
-        
-        # Sort by priority
-        return sorted(insights, key=lambda x: x.priority)
+class _Rule(NamedTuple):
+    """Declarative insight rule.
     
-    def _generate_performance_insights(self) -> List[Insight]:
-        """Generate insights from basic performance metrics."""
-        insights = []
-        basic = self.metrics.get('basic', {})
-        
-        if not basic:
-            return insights
-        
-        roi = basic.get('roi', 0)
-        win_rate = basic.get('win_rate', 0)
-        total_bets = basic.get('total_bets', 0)
-        
+    The insight fires when ``op(value, threshold)`` is true, where the
+    value is ``section.get(metric, 0)`` for a key ``metric`` or
+    ``metric(section)`` for a callable. ``threshold`` is either a key
+    into the generator's thresholds or a literal number. The template
+    description is a ``str.format`` pattern receiving ``value``,
+    ``magnitude`` (``abs(value)``), ``threshold`` and ``threshold_pct``
+    (the threshold preformatted as ``'15.0%'``).
+    """
+    metric: Union[str, Callable[[Dict], float]]
+    op: Callable[[float, float], bool]
+    threshold: Union[str, float]
+    template: Insight
+
+
+def _max_drawdown_magnitude(risk: Dict) -> float:
+    """Absolute max drawdown (stored as a negative percentage)."""
+    return abs(risk.get('max_drawdown', 0))
+
+
+def _current_loss_streak(streaks: Dict) -> int:
+    """Length of the current streak if it is a losing one, else 0."""
+    current = streaks.get('current_streak', {})
+    return current.get('count', 0) if current.get('type') == 'loss' else 0
+
+
+# Rules per metrics section. Each section holds a list of chains; within a
+# chain only the first matching rule fires (the old if/elif ladders).
+_RULES: Dict[str, List[List[_Rule]]] = {
+    'basic': [
         # ROI insights
-        if roi >= self.thresholds['excellent_roi']:
-            insights.append(Insight(
+        [
+            _Rule('roi', operator.ge, 'excellent_roi', Insight(
                 type='success',
                 title='🎯 ROI Excelente',
-                description=f'ROI de {roi:.1f}% está acima do limiar de excelência ({self.thresholds["excellent_roi"]:.1f}%)',
+                description='ROI de {value:.1f}% está acima do limiar de excelência ({threshold_pct})',
                 action='Continuar estratégia atual - modelo está performando muito bem',
                 priority=1
-            ))
-        elif roi >= self.thresholds['good_roi']:
-            insights.append(Insight(
+            )),
+            _Rule('roi', operator.ge, 'good_roi', Insight(
                 type='info',
                 title='✅ ROI Positivo',
-                description=f'ROI de {roi:.1f}% está no intervalo bom',
+                description='ROI de {value:.1f}% está no intervalo bom',
                 action='Performance satisfatória - monitorar consistência',
                 priority=2
-            ))
-        elif roi <= self.thresholds['poor_roi']:
-            insights.append(Insight(
+            )),
+            _Rule('roi', operator.le, 'poor_roi', Insight(
                 type='danger',
                 title='⚠️ ROI Negativo',
-                description=f'ROI de {roi:.1f}% está abaixo do aceitável',
+                description='ROI de {value:.1f}% está abaixo do aceitável',
                 action='URGENTE: Revisar estratégia, modelos e seleção de apostas',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Win rate insights
-        if win_rate >= self.thresholds['excellent_winrate']:
-            insights.append(Insight(
+        [
+            _Rule('win_rate', operator.ge, 'excellent_winrate', Insight(
                 type='success',
                 title='🏆 Taxa de Acerto Alta',
-                description=f'Win rate de {win_rate:.1f}% é excelente',
+                description='Win rate de {value:.1f}% é excelente',
                 action='Modelo bem calibrado - manter critérios de seleção',
                 priority=2
-            ))
-        elif win_rate <= self.thresholds['poor_winrate']:
-            insights.append(Insight(
+            )),
+            _Rule('win_rate', operator.le, 'poor_winrate', Insight(
                 type='warning',
                 title='📉 Taxa de Acerto Baixa',
-                description=f'Win rate de {win_rate:.1f}% está abaixo do esperado',
+                description='Win rate de {value:.1f}% está abaixo do esperado',
                 action='Revisar calibração do modelo e critérios de confidence',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Sample size insight
-        if total_bets < 30:
-            insights.append(Insight(
+        [
+            _Rule('total_bets', operator.lt, 30, Insight(
                 type='info',
                 title='📊 Amostra Pequena',
-                description=f'Apenas {total_bets} apostas - resultados podem ter alta variância',
+                description='Apenas {value} apostas - resultados podem ter alta variância',
                 action='Continuar coletando dados antes de conclusões definitivas',
                 priority=3
-            ))
-        
-        return insights
-    
-    def _generate_risk_insights(self) -> List[Insight]:
-        """Generate insights from risk metrics."""
-        insights = []
-        risk = self.metrics.get('risk', {})
-        
-        if not risk:
-            return insights
-        
-        sharpe = risk.get('sharpe_ratio', 0)
-        max_dd = risk.get('max_drawdown', 0)
-        volatility = risk.get('volatility', 0)
-        
+            )),
+        ],
+    ],
+    'risk': [
         # Sharpe ratio insights
-        if sharpe >= self.thresholds['excellent_sharpe']:
-            insights.append(Insight(
+        [
+            _Rule('sharpe_ratio', operator.ge, 'excellent_sharpe', Insight(
                 type='success',
                 title='📈 Sharpe Ratio Excelente',
-                description=f'Sharpe de {sharpe:.2f} indica retorno ajustado ao risco muito bom',
+                description='Sharpe de {value:.2f} indica retorno ajustado ao risco muito bom',
                 action='Risco bem gerenciado - continuar abordagem',
                 priority=2
-            ))
-        elif sharpe <= self.thresholds['poor_sharpe']:
-            insights.append(Insight(
+            )),
+            _Rule('sharpe_ratio', operator.le, 'poor_sharpe', Insight(
                 type='warning',
                 title='⚠️ Sharpe Ratio Baixo',
-                description=f'Sharpe de {sharpe:.2f} indica retorno não justifica o risco',
+                description='Sharpe de {value:.2f} indica retorno não justifica o risco',
                 action='Considerar redução de stake ou filtros mais rigorosos',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Drawdown insights
-        if abs(max_dd) >= self.thresholds['danger_drawdown']:
-            insights.append(Insight(
+        [
+            _Rule(_max_drawdown_magnitude, operator.ge, 'danger_drawdown', Insight(
                 type='danger',
                 title='🔴 Drawdown Perigoso',
-                description=f'Max drawdown de {abs(max_dd):.1f}% é muito alto',
+                description='Max drawdown de {value:.1f}% é muito alto',
                 action='CRÍTICO: Reduzir exposição imediatamente ou pausar operações',
                 priority=1
-            ))
-        elif abs(max_dd) >= self.thresholds['warning_drawdown']:
-            insights.append(Insight(
+            )),
+            _Rule(_max_drawdown_magnitude, operator.ge, 'warning_drawdown', Insight(
                 type='warning',
                 title='⚠️ Drawdown Elevado',
-                description=f'Max drawdown de {abs(max_dd):.1f}% merece atenção',
+                description='Max drawdown de {value:.1f}% merece atenção',
                 action='Revisar bankroll management e considerar reduzir stakes',
                 priority=2
-            ))
-        
+            )),
+        ],
         # Volatility insights
-        if volatility >= self.thresholds['high_volatility']:
-            insights.append(Insight(
+        [
+            _Rule('volatility', operator.ge, 'high_volatility', Insight(
                 type='info',
                 title='📊 Alta Volatilidade',
-                description=f'Volatilidade de {volatility:.1f}% indica resultados inconsistentes',
+                description='Volatilidade de {value:.1f}% indica resultados inconsistentes',
                 action='Considerar diversificar entre mais mercados ou reduzir stakes',
                 priority=2
-            ))
-        
-        return insights
-    
-    def _generate_calibration_insights(self) -> List[Insight]:
-        """Generate insights from calibration metrics."""
-        insights = []
-        calibration = self.metrics.get('calibration', {})
-        
-        if not calibration:
-            return insights
-        
-        brier = calibration.get('brier_score', 0)
-        log_loss = calibration.get('log_loss', 0)
-        overround_beat = calibration.get('overround_beat_rate', 0)
-        
+            )),
+        ],
+    ],
+    'calibration': [
         # Brier score insights
-        if brier <= self.thresholds['excellent_brier']:
-            insights.append(Insight(
+        [
+            _Rule('brier_score', operator.le, 'excellent_brier', Insight(
                 type='success',
                 title='✨ Calibração Excelente',
-                description=f'Brier score de {brier:.3f} indica modelo muito bem calibrado',
+                description='Brier score de {value:.3f} indica modelo muito bem calibrado',
                 action='Probabilidades precisas - confiar nas estimativas',
                 priority=2
-            ))
-        elif brier >= self.thresholds['poor_brier']:
-            insights.append(Insight(
+            )),
+            _Rule('brier_score', operator.ge, 'poor_brier', Insight(
                 type='warning',
                 title='⚠️ Modelo Mal Calibrado',
-                description=f'Brier score de {brier:.3f} indica problemas de calibração',
+                description='Brier score de {value:.3f} indica problemas de calibração',
                 action='Revisar modelos preditivos e recalibrar probabilidades',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Overround beat rate
-        if overround_beat >= 60:
-            insights.append(Insight(
+        [
+            _Rule('overround_beat_rate', operator.ge, 60, Insight(
                 type='success',
                 title='🎯 Batendo Margem da Casa',
-                description=f'{overround_beat:.0f}% das apostas com edge positivo',
+                description='{value:.0f}% das apostas com edge positivo',
                 action='Identificação de value funcionando bem',
                 priority=2
-            ))
-        elif overround_beat <= 40:
-            insights.append(Insight(
+            )),
+            _Rule('overround_beat_rate', operator.le, 40, Insight(
                 type='warning',
                 title='📉 Dificuldade em Bater Margem',
-                description=f'Apenas {overround_beat:.0f}% com edge positivo',
+                description='Apenas {value:.0f}% com edge positivo',
                 action='Revisar critérios de edge mínimo ou mercados escolhidos',
                 priority=2
-            ))
-        
-        return insights
-    
-    def _generate_clv_insights(self) -> List[Insight]:
-        """Generate insights from CLV metrics."""
-        insights = []
-        clv = self.metrics.get('clv', {})
-        
-        if not clv:
-            return insights
-        
-        clv_avg = clv.get('clv_average', 0)
-        clv_positive_rate = clv.get('clv_positive_rate', 0)
-        clv_correlation = clv.get('clv_correlation', 0)
-        
+            )),
+        ],
+    ],
+    'clv': [
         # Average CLV insights
-        if clv_avg >= self.thresholds['excellent_clv']:
-            insights.append(Insight(
+        [
+            _Rule('clv_average', operator.ge, 'excellent_clv', Insight(
                 type='success',
                 title='⭐ CLV Consistentemente Positivo',
-                description=f'CLV médio de {clv_avg:.3f} é excelente',
+                description='CLV médio de {value:.3f} é excelente',
                 action='Edge real comprovado - continuar estratégia',
                 priority=1
-            ))
-        elif clv_avg <= self.thresholds['poor_clv']:
-            insights.append(Insight(
+            )),
+            _Rule('clv_average', operator.le, 'poor_clv', Insight(
                 type='danger',
                 title='🔴 CLV Negativo',
-                description=f'CLV médio de {clv_avg:.3f} indica apostas ruins',
+                description='CLV médio de {value:.3f} indica apostas ruins',
                 action='CRÍTICO: Timing ruim ou modelos imprecisos - revisar',
                 priority=1
-            ))
-        
+            )),
+        ],
         # CLV positive rate
-        if clv_positive_rate >= self.thresholds['excellent_clv_rate']:
-            insights.append(Insight(
+        [
+            _Rule('clv_positive_rate', operator.ge, 'excellent_clv_rate', Insight(
                 type='success',
                 title='✅ Alta Taxa de CLV+',
-                description=f'{clv_positive_rate:.0f}% das apostas com CLV positivo',
+                description='{value:.0f}% das apostas com CLV positivo',
                 action='Timing de entrada muito bom - manter',
                 priority=2
-            ))
-        elif clv_positive_rate <= self.thresholds['poor_clv_rate']:
-            insights.append(Insight(
+            )),
+            _Rule('clv_positive_rate', operator.le, 'poor_clv_rate', Insight(
                 type='warning',
                 title='⚠️ Baixa Taxa de CLV+',
-                description=f'Apenas {clv_positive_rate:.0f}% com CLV positivo',
+                description='Apenas {value:.0f}% com CLV positivo',
                 action='Melhorar timing ou revisar seleção de mercados',
                 priority=2
-            ))
-        
+            )),
+        ],
         # CLV correlation
-        if clv_correlation > 0.3:
-            insights.append(Insight(
+        [
+            _Rule('clv_correlation', operator.gt, 0.3, Insight(
                 type='success',
                 title='📊 CLV Correlaciona com Vitórias',
-                description=f'Correlação de {clv_correlation:.2f} entre CLV e resultado',
+                description='Correlação de {value:.2f} entre CLV e resultado',
                 action='CLV é bom preditor - continuar focando nele',
                 priority=3
-            ))
-        
-        return insights
-    
-    def _generate_streak_insights(self) -> List[Insight]:
-        """Generate insights from streak metrics."""
-        insights = []
-        streaks = self.metrics.get('streaks', {})
-        
-        if not streaks:
-            return insights
-        
-        current = streaks.get('current_streak', {})
-        longest_lose = streaks.get('longest_lose_streak', 0)
-        win_after_loss = streaks.get('win_after_loss', 0)
-        
+            )),
+        ],
+    ],
+    'streaks': [
         # Current losing streak warning
-        if current.get('type') == 'loss' and current.get('count', 0) >= 5:
-            insights.append(Insight(
+        [
+            _Rule(_current_loss_streak, operator.ge, 5, Insight(
                 type='warning',
                 title='⚠️ Sequência de Derrotas',
-                description=f'{current["count"]} derrotas consecutivas',
+                description='{value} derrotas consecutivas',
                 action='Evitar decisões emocionais - manter disciplina',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Longest losing streak
-        if longest_lose >= 10:
-            insights.append(Insight(
+        [
+            _Rule('longest_lose_streak', operator.ge, 10, Insight(
                 type='info',
                 title='📊 Sequência Longa de Derrotas',
-                description=f'Maior sequência foi de {longest_lose} derrotas',
+                description='Maior sequência foi de {value} derrotas',
                 action='Normal em apostas - importante ter bankroll para aguentar',
                 priority=3
-            ))
-        
+            )),
+        ],
         # Recovery after losses
-        if win_after_loss >= 60:
-            insights.append(Insight(
+        [
+            _Rule('win_after_loss', operator.ge, 60, Insight(
                 type='success',
                 title='💪 Boa Recuperação',
-                description=f'{win_after_loss:.0f}% de vitórias após derrotas',
+                description='{value:.0f}% de vitórias após derrotas',
                 action='Sem tilt aparente - disciplina mantida',
                 priority=3
-            ))
-        
-        return insights
-    
-    def _generate_bankroll_insights(self) -> List[Insight]:
-        """Generate insights from bankroll metrics."""
-        insights = []
-        bankroll = self.metrics.get('bankroll', {})
-        
-        if not bankroll:
-            return insights
-        
-        growth = bankroll.get('bankroll_growth', 0)
-        kelly = bankroll.get('kelly_suggested', 0)
-        ev_per_bet = bankroll.get('expected_value_per_bet', 0)
-        
+            )),
+        ],
+    ],
+    'bankroll': [
         # Bankroll growth
-        if growth >= 20:
-            insights.append(Insight(
+        [
+            _Rule('bankroll_growth', operator.ge, 20, Insight(
                 type='success',
                 title='📈 Crescimento Excelente',
-                description=f'Bankroll cresceu {growth:.1f}%',
+                description='Bankroll cresceu {value:.1f}%',
                 action='Performance excepcional - documentar estratégia',
                 priority=1
-            ))
-        elif growth <= -15:
-            insights.append(Insight(
+            )),
+            _Rule('bankroll_growth', operator.le, -15, Insight(
                 type='danger',
                 title='📉 Perda Significativa',
-                description=f'Bankroll caiu {abs(growth):.1f}%',
+                description='Bankroll caiu {magnitude:.1f}%',
                 action='URGENTE: Pausar e reavaliar completamente',
                 priority=1
-            ))
-        
+            )),
+        ],
         # Kelly criterion
-        if kelly >= 5:
-            insights.append(Insight(
+        [
+            _Rule('kelly_suggested', operator.ge, 5, Insight(
                 type='info',
                 title='📊 Kelly Sugere Stakes Maiores',
-                description=f'Kelly médio de {kelly:.1f}% do bankroll',
+                description='Kelly médio de {value:.1f}% do bankroll',
                 action='Considerar aumentar stakes se confortável com risco',
                 priority=3
-            ))
-        
+            )),
+        ],
         # Expected value
-        if ev_per_bet > 0.5:
-            insights.append(Insight(
+        [
+            _Rule('expected_value_per_bet', operator.gt, 0.5, Insight(
                 type='success',
                 title='💰 EV Positivo Forte',
-                description=f'EV médio de R$ {ev_per_bet:.2f} por aposta',
+                description='EV médio de R$ {value:.2f} por aposta',
                 action='Edge matemático comprovado - continuar',
                 priority=2
-            ))
+            )),
+        ],
+    ],
+}
+
+
+class InsightGenerator:
+    """Generate automated insights from metrics."""
+    
+    def __init__(self, metrics: Dict, thresholds: Dict = None):
+        """Initialize insight generator.
+        
+        Args:
+            metrics: Complete metrics dictionary from MetricsAggregator
+            thresholds: Custom thresholds (uses defaults if None)
+        """
+        self._cached = None
+        self._metrics = metrics
+        self.thresholds = thresholds or METRICS_THRESHOLDS
+    
+    @property
+    def metrics(self) -> Dict:
+        """Metrics dictionary the insights are generated from."""
+        return self._metrics
+    
+    @metrics.setter
+    def metrics(self, metrics: Dict):
+        self._metrics = metrics
+        self._cached = None
+    
+    @property
+    def thresholds(self) -> Dict:
+        """Thresholds the rules compare metrics against."""
+        return self._thresholds
+    
+    @thresholds.setter
+    def thresholds(self, thresholds: Dict):
+        self._thresholds = thresholds
+        self.invalidate()
+    
+    def invalidate(self):
+        """Drop cached insights so they are regenerated on the next call.
+        
+        Assigning new ``metrics`` or ``thresholds`` invalidates
+        automatically; call this after mutating either one in place.
+        """
+        self._cached = None
+        # Thresholds preformatted once for the rule descriptions
+        self._thresholds_pct = {
+            key: f'{value:.1f}%' for key, value in self._thresholds.items()
+        }
+    
+    def generate_all_insights(self) -> List[Insight]:
+        """Generate all insights from metrics.
+        
+        Results are cached until ``invalidate()`` is called or ``metrics``
+        is replaced.
+        
+        Returns:
+            List of Insight objects, sorted by priority
+        """
+        return list(self._get_cached_insights())
+    
+    def _get_cached_insights(self) -> List[Insight]:
+        """Return the cached, priority-sorted insights, building them once."""
+        if self._cached is None:
+            self._cached = self._build_all_insights()
+        return self._cached
+    
+    def _build_all_insights(self) -> List[Insight]:
+        """Run every insight rule and sort the results by priority."""
+        insights = []
+        
+        for section in _RULES:
+            insights.extend(self._generate_section_insights(section))
+        
+        # Sort by priority
+        return sorted(insights, key=lambda x: x.priority)
+    
+    def _generate_section_insights(self, section: str) -> List[Insight]:
+        """Evaluate the rules of one metrics section.
+        
+        Args:
+            section: Metrics section name ('basic', 'risk', ...)
+            
+        Returns:
+            List of fired insights, in rule order
+        """
+        insights = []
+        data = self.metrics.get(section, {})
+        
+        if not data:
+            return insights
+        
+        # Each metric is read once, however many rules compare it
+        values = {}
+        
+        for chain in _RULES[section]:
+            for metric, op, threshold, template in chain:
+                threshold_pct = None
+                if isinstance(threshold, str):
+                    threshold_pct = self._thresholds_pct[threshold]
+                    threshold = self._thresholds[threshold]
+                
+                if metric in values:
+                    value = values[metric]
+                elif callable(metric):
+                    value = values[metric] = metric(data)
+                else:
+                    value = values[metric] = data.get(metric, 0)
+                if op(value, threshold):
+                    insights.append(replace(
+                        template,
+                        description=template.description.format(
+                            value=value,
+                            magnitude=abs(value),
+                            threshold=threshold,
+                            threshold_pct=threshold_pct,
+                        ),
+                    ))
+                    break
         
         return insights
     
@@ -399,8 +428,7 @@ class InsightGenerator:
         Returns:
             List of top insights
         """
-        all_insights = self.generate_all_insights()
-        return all_insights[:n]
+        return self._get_cached_insights()[:n]
     
     def get_insights_by_type(self, insight_type: str) -> List[Insight]:
         """Get insights filtered by type.
@@ -411,5 +439,4 @@ class InsightGenerator:
         Returns:
             List of filtered insights
         """
-        all_insights = self.generate_all_insights()
-        return [i for i in all_insights if i.type == insight_type]
+        return [i for i in self._get_cached_insights() if i.type == insight_type]
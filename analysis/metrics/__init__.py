@@ -1,5 +1,6 @@
 """Metrics package for comprehensive performance analysis."""
 from .base import MetricsCalculator
+from .context import MetricsContext
 from .basic import BasicMetrics
 from .risk import RiskMetrics
 from .calibration import CalibrationMetrics
@@ -10,6 +11,7 @@ from .aggregator import MetricsAggregator
 
 __all__ = [
     'MetricsCalculator',
+    'MetricsContext',
     'BasicMetrics',
     'RiskMetrics',
     'CalibrationMetrics',
@@ -1,9 +1,19 @@
 """Metrics aggregator to combine all metrics calculators."""
+import os
+import pickle
+from concurrent.futures import ThreadPoolExecutor
+from functools import cached_property
 from typing import Dict, List, Optional
 from datetime import datetime
-from database.models import Bet
+import numpy as np
+from sqlalchemy import func
+from sqlalchemy.orm import joinedload
+from config.settings import DATA_DIR
+from database.models import Bet, Match
 from database.db import get_db
+from utils.logger import log
 
+from .context import MetricsContext
 from .basic import BasicMetrics
 from .risk import RiskMetrics
 from .calibration import CalibrationMetrics
@@ -12,6 +22,10 @@ from .streaks import StreakMetrics
 from .bankroll import BankrollMetrics
 
 
+# Last metrics computed from the database, reused while bets are unchanged
+METRICS_SNAPSHOT_FILE = DATA_DIR / "metrics_snapshot.pkl"
+
+
 class MetricsAggregator:
     """Aggregate all metrics calculations."""
     
@@ -19,7 +33,8 @@ class MetricsAggregator:
         self, 
         bets: Optional[List[Bet]] = None,
         initial_bankroll: float = 1000.0,
-        risk_free_rate: float = 0.0
+        risk_free_rate: float = 0.0,
+        context: Optional[MetricsContext] = None
     ):
         """Initialize metrics aggregator.
         
@@ -27,25 +42,93 @@ class MetricsAggregator:
             bets: List of bets to analyze (if None, loads from database)
             initial_bankroll: Initial bankroll amount for paper trading
             risk_free_rate: Annual risk-free rate for risk calculations
+            context: Prebuilt context of the bets (``bets`` is then ignored)
         """
-        if bets is None:
-            bets = self._load_bets_from_db()
-        
-        self.bets = bets
+        self._bets = bets
+        self._context = context
         self.initial_bankroll = initial_bankroll
         self.risk_free_rate = risk_free_rate
         
-        # Initialize all metrics calculators
-        self.basic = BasicMetrics(bets)
-        self.risk = RiskMetrics(bets)
-        self.calibration = CalibrationMetrics(bets)
-        self.clv = CLVMetrics(bets)
-        self.streaks = StreakMetrics(bets)
-        self.bankroll = BankrollMetrics(bets, initial_bankroll)
+        # Bets loaded from the database are fingerprinted before anything is
+        # loaded: a write racing the load only makes the key older, so the
+        # next call misses instead of serving a stale snapshot
+        self._snapshot_key = None
+        if context is None and bets is None:
+            self._snapshot_key = (
+                self._bets_fingerprint(), initial_bankroll, risk_free_rate
+            )
+    
+    # The bets, their context and the calculators are built on first use,
+    # so a snapshot hit in calculate_all never loads the bets
+    
+    @cached_property
+    def context(self) -> MetricsContext:
+        """Shared context of the bets (loads them from the database if needed)."""
+        if self._context is not None:
+            return self._context
+        
+        bets = self._bets if self._bets is not None else self._load_bets_from_db()
+        return MetricsContext(bets)
+    
+    @property
+    def bets(self) -> List[Bet]:
+        """Bets being analyzed."""
+        return self.context.bets
+    
+    # All metrics calculators share one context, so the bets are converted
+    # to columns, filtered and sorted only once
+    
+    @cached_property
+    def basic(self) -> BasicMetrics:
+        """Basic performance metrics of the bets."""
+        return BasicMetrics(context=self.context)
+    
+    @cached_property
+    def risk(self) -> RiskMetrics:
+        """Risk metrics of the bets."""
+        return RiskMetrics(context=self.context)
+    
+    @cached_property
+    def calibration(self) -> CalibrationMetrics:
+        """Calibration metrics of the bets."""
+        return CalibrationMetrics(context=self.context)
+    
+    @cached_property
+    def clv(self) -> CLVMetrics:
+        """Closing line value metrics of the bets."""
+        return CLVMetrics(context=self.context)
+    
+    @cached_property
+    def streaks(self) -> StreakMetrics:
+        """Streak metrics of the bets."""
+        return StreakMetrics(context=self.context)
+    
+    @cached_property
+    def bankroll(self) -> BankrollMetrics:
+        """Bankroll metrics of the bets."""
+        return BankrollMetrics(initial_bankroll=self.initial_bankroll, context=self.context)
     
     def calculate_all(self) -> Dict:
         """Calculate all metrics.
         
+        When bets come from the database and have not changed since the
+        last snapshot, the snapshot is returned without loading the bets.
+        
+        Returns:
+            Dictionary containing all calculated metrics
+        """
+        if self._snapshot_key is None:
+            return self._calculate_metrics()
+        
+        metrics = self._load_snapshot()
+        if metrics is None:
+            metrics = self._calculate_metrics()
+            self._save_snapshot(metrics)
+        return metrics
+    
+    def _calculate_metrics(self) -> Dict:
+        """Run every metrics calculator.
+        
         Returns:
             Dictionary containing all calculated metrics
         """
@@ -58,8 +141,8 @@ class MetricsAggregator:
             'bankroll': self.bankroll.calculate(),
             'metadata': {
                 'total_bets': len(self.bets),
-                'settled_bets': len([b for b in self.bets if b.status in ['won', 'lost']]),
-                'pending_bets': len([b for b in self.bets if b.status == 'pending']),
+                'settled_bets': int(self.context.settled_mask.sum()),
+                'pending_bets': int((self.context.columns['status'] == 'pending').sum()),
                 'initial_bankroll': self.initial_bankroll,
             }
         }
@@ -73,23 +156,11 @@ class MetricsAggregator:
         Returns:
             Dictionary with metrics for each sport
         """
-        results = {}
+        games = self.context.columns['game']
         
-        for sport in sports:
-            sport_bets = [
-                b for b in self.bets 
-                if hasattr(b.match, 'game') and b.match.game == sport
-            ]
-            
-            if sport_bets:
-                aggregator = MetricsAggregator(
-                    sport_bets, 
-                    self.initial_bankroll, 
-                    self.risk_free_rate
-                )
-                results[sport] = aggregator.calculate_all()
-        
-        return results
+        return self._calculate_groups(
+            (sport, np.flatnonzero(games == sport)) for sport in sports
+        )
     
     def calculate_by_market(self, markets: List[str]) -> Dict:
         """Calculate metrics segmented by market type.
@@ -100,20 +171,11 @@ class MetricsAggregator:
         Returns:
             Dictionary with metrics for each market
         """
-        results = {}
-        
-        for market in markets:
-            market_bets = [b for b in self.bets if b.market_type == market]
-            
-            if market_bets:
-                aggregator = MetricsAggregator(
-                    market_bets, 
-                    self.initial_bankroll, 
-                    self.risk_free_rate
-                )
-                results[market] = aggregator.calculate_all()
+        market_types = self.context.columns['market_type']
         
-        return results
+        return self._calculate_groups(
+            (market, np.flatnonzero(market_types == market)) for market in markets
+        )
     
     def calculate_by_confidence_range(self, ranges: List[tuple]) -> Dict:
         """Calculate metrics segmented by confidence ranges.
@@ -124,26 +186,9 @@ class MetricsAggregator:
         Returns:
             Dictionary with metrics for each range
         """
-        results = {}
-        
-        for range_tuple in ranges:
-            min_conf, max_conf = range_tuple[0], range_tuple[1]
-            label = range_tuple[2] if len(range_tuple) > 2 else f"{min_conf}-{max_conf}"
-            
-            range_bets = [
-                b for b in self.bets 
-                if min_conf <= b.confidence < max_conf
-            ]
-            
-            if range_bets:
-                aggregator = MetricsAggregator(
-                    range_bets, 
-                    self.initial_bankroll, 
-                    self.risk_free_rate
-                )
-                results[label] = aggregator.calculate_all()
-        
-        return results
+        return self._calculate_groups(
+            self._range_groups(self.context.columns['confidence'], ranges)
+        )
     
     def calculate_by_odds_range(self, ranges: List[tuple]) -> Dict:
         """Calculate metrics segmented by odds ranges.
@@ -154,26 +199,81 @@ class MetricsAggregator:
         Returns:
             Dictionary with metrics for each range
         """
-        results = {}
+        return self._calculate_groups(
+            self._range_groups(self.context.columns['odds'], ranges)
+        )
+    
+    @staticmethod
+    def _range_groups(values: np.ndarray, ranges: List[tuple]):
+        """Split bet indices into [min, max) ranges of a column.
+        
+        Sorted, non-overlapping ranges are bucketed with a single
+        ``np.searchsorted`` call; anything else falls back to one mask
+        per range.
+        
+        Args:
+            values: Column to bucket (aligned with ``self.bets``)
+            ranges: List of (min, max[, label]) tuples
+            
+        Yields:
+            Tuples of (label, bet indices)
+        """
+        lows = np.array([r[0] for r in ranges], dtype=float)
+        highs = np.array([r[1] for r in ranges], dtype=float)
+        labels = [r[2] if len(r) > 2 else f"{r[0]}-{r[1]}" for r in ranges]
         
-        for range_tuple in ranges:
-            min_odds, max_odds = range_tuple[0], range_tuple[1]
-            label = range_tuple[2] if len(range_tuple) > 2 else f"{min_odds}-{max_odds}"
+        if len(ranges) and np.all(lows[1:] >= highs[:-1]):
+            bucket = np.searchsorted(lows, values, side='right') - 1
+            in_range = bucket >= 0
+            in_range[in_range] = values[in_range] < highs[bucket[in_range]]
+            bucket[~in_range] = -1
             
-            range_bets = [
-                b for b in self.bets 
-                if min_odds <= b.odds < max_odds
-            ]
+            for i, label in enumerate(labels):
+                yield label, np.flatnonzero(bucket == i)
+        else:
+            for low, high, label in zip(lows, highs, labels):
+                yield label, np.flatnonzero((values >= low) & (values < high))
+    
+    def _calculate_groups(self, groups) -> Dict:
+        """Calculate all metrics for each non-empty group of bets.
+        
+        Groups are independent, so they are calculated concurrently on a
+        thread pool; results keep the order of ``groups``.
+        
+        Args:
+            groups: Iterable of (label, bet indices) tuples
             
-            if range_bets:
-                aggregator = MetricsAggregator(
-                    range_bets, 
-                    self.initial_bankroll, 
-                    self.risk_free_rate
-                )
-                results[label] = aggregator.calculate_all()
+        Returns:
+            Dictionary with metrics for each group label
+        """
+        groups = [(label, indices) for label, indices in groups if indices.size]
+        
+        if len(groups) <= 1:
+            return {label: self._calculate_group(indices) for label, indices in groups}
+        
+        max_workers = min(len(groups), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            futures = [
+                (label, executor.submit(self._calculate_group, indices))
+                for label, indices in groups
+            ]
+            return {label: future.result() for label, future in futures}
+    
+    def _calculate_group(self, indices: np.ndarray) -> Dict:
+        """Calculate all metrics for the bets at the given indices.
         
-        return results
+        Args:
+            indices: Positions in ``self.bets``
+            
+        Returns:
+            Dictionary containing all calculated metrics for the group
+        """
+        aggregator = MetricsAggregator(
+            initial_bankroll=self.initial_bankroll,
+            risk_free_rate=self.risk_free_rate,
+            context=self.context.subset(indices)
+        )
+        return aggregator.calculate_all()
     
     def _load_bets_from_db(self) -> List[Bet]:
         """Load all confirmed bets from database.
@@ -182,5 +282,65 @@ class MetricsAggregator:
             List of Bet objects
         """
         with get_db() as db:
-            bets = db.query(Bet).filter(Bet.confirmed == True).all()
+            bets = db.query(Bet).options(joinedload(Bet.match)).filter(
+                Bet.confirmed == True
+            ).all()
+            # Detach before commit so loaded attributes are not expired
+            db.expunge_all()
             return list(bets)
+    
+    def _bets_fingerprint(self) -> tuple:
+        """Fingerprint the confirmed bets and their matches in the database.
+        
+        Any new, removed or updated bet changes the fingerprint, and so
+        does any update to a match of a confirmed bet (the metrics read
+        the bets' matches, e.g. the game for per-sport CLV).
+        
+        Returns:
+            Tuple of (count, max id, max updated_at, max match updated_at)
+        """
+        with get_db() as db:
+            return tuple(db.query(
+                func.count(Bet.id),
+                func.max(Bet.id),
+                func.max(Bet.updated_at),
+                func.max(Match.updated_at),
+            ).outerjoin(
+                Match,
+                Bet.match_id == Match.id
+            ).filter(Bet.confirmed == True).one())
+    
+    def _load_snapshot(self) -> Optional[Dict]:
+        """Load the metrics snapshot if it matches the current bets.
+        
+        Returns:
+            Snapshot metrics, or None if missing or stale
+        """
+        if not METRICS_SNAPSHOT_FILE.exists():
+            return None
+        
+        try:
+            with open(METRICS_SNAPSHOT_FILE, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            log.warning(f"Failed to load metrics snapshot: {e}")
+            return None
+        
+        if snapshot.get('key') != self._snapshot_key:
+            return None
+        return snapshot['metrics']
+    
+    def _save_snapshot(self, metrics: Dict):
+        """Save metrics as the snapshot for the current bets.
+        
+        Args:
+            metrics: Metrics returned by ``calculate_all``
+        """
+        tmp_file = METRICS_SNAPSHOT_FILE.with_suffix('.tmp')
+        try:
+            METRICS_SNAPSHOT_FILE.parent.mkdir(parents=True, exist_ok=True)
+            with open(tmp_file, 'wb') as f:
+                pickle.dump({'key': self._snapshot_key, 'metrics': metrics}, f)
+            os.replace(tmp_file, METRICS_SNAPSHOT_FILE)
+        except Exception as e:
+            log.warning(f"Failed to save metrics snapshot: {e}")
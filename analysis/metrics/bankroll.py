@@ -1,23 +1,37 @@
 """Bankroll management metrics."""
-from typing import Dict, List
+from typing import Dict, List, Optional
 import numpy as np
-from .base import MetricsCalculator
+from .base import MetricsCalculator, memoize_calculation
+from .context import MetricsContext
 from database.models import Bet
 
 
 class BankrollMetrics(MetricsCalculator):
     """Calculate bankroll management metrics."""
     
-    def __init__(self, bets: List[Bet] = None, initial_bankroll: float = 1000.0):
+    def __init__(
+        self,
+        bets: List[Bet] = None,
+        initial_bankroll: float = 1000.0,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+        context: Optional[MetricsContext] = None,
+    ):
         """Initialize bankroll metrics.
         
         Args:
             bets: List of bets
             initial_bankroll: Starting bankroll amount
+            columns: Columns already built for ``bets``
+            context: Context shared with other calculators over the same bets
         """
-        super().__init__(bets)
+        super().__init__(bets, columns, context)
         self.initial_bankroll = initial_bankroll
     
+    def _cache_params(self) -> tuple:
+        """Include the initial bankroll in the memoization key."""
+        return (self.initial_bankroll,)
+    
+    @memoize_calculation
     def calculate(self) -> Dict:
         """Calculate bankroll metrics.
         
@@ -35,41 +49,48 @@ class BankrollMetrics(MetricsCalculator):
         if not self.bets:
             return self._empty_metrics()
         
-        # Filter settled bets
-        settled_bets = sorted(
-            [b for b in self.bets if b.status in ['won', 'lost'] and b.settled_at],
-            key=lambda x: x.settled_at
-        )
+        # Filter settled bets, in settlement order
+        order = self.context.settled_order
         
-        if not settled_bets:
+        if not order.size:
             return self._empty_metrics()
         
         # Calculate current bankroll
-        total_profit = sum(b.profit for b in settled_bets if b.profit)
+        stakes = self.columns['stake'][order]
+        total_profit = float(np.nansum(self.columns['profit'][order]))
         current_bankroll = self.initial_bankroll + total_profit
         
         # Bankroll growth
         bankroll_growth = ((current_bankroll - self.initial_bankroll) / self.initial_bankroll) * 100
         
         # Units won (assuming stake = 1 unit)
-        avg_stake = np.mean([b.stake for b in settled_bets])
+        avg_stake = np.mean(stakes)
         units_won = total_profit / avg_stake if avg_stake > 0 else 0
         
         # Kelly suggested stake
-        kelly_suggested = self._calculate_kelly_average(settled_bets)
+        kelly_suggested = self._calculate_kelly_average(
+            self.columns['odds'][order],
+            self.columns['model_probability'][order],
+        )
         
         # Break-even win rate
-        break_even_wr = self._calculate_break_even_winrate(settled_bets)
+        break_even_wr = self._calculate_break_even_winrate(self.columns['odds'][order])
         
         # Expected value per bet
-        ev_per_bet = self._calculate_ev_per_bet(settled_bets)
+        ev_per_bet = self._calculate_ev_per_bet(
+            stakes,
+            self.columns['odds'][order],
+            self.columns['model_probability'][order],
+        )
         
         # ROI if flat betting
-        total_stake = sum(b.stake for b in settled_bets)
+        total_stake = float(stakes.sum())
         roi_flat = (total_profit / total_stake * 100) if total_stake > 0 else 0
         
         # Equity curve
-        equity_curve = self._build_equity_curve(settled_bets)
+        equity_curve = self._build_equity_curve(
+            self.columns['profit'][order], self.columns['settled_at'][order]
+        )
         
         return {
             'current_bankroll': round(current_bankroll, 2),
@@ -82,91 +103,99 @@ class BankrollMetrics(MetricsCalculator):
             'equity_curve': equity_curve,
         }
     
-    def _calculate_kelly_average(self, bets: List[Bet]) -> float:
+    def _calculate_kelly_average(self, odds: np.ndarray, probabilities: np.ndarray) -> float:
         """Calculate average Kelly criterion stake.
         
         Kelly formula: (edge / odds) where edge = model_prob - implied_prob
         
         Args:
-            bets: List of settled bets
+            odds: Odds of the settled bets
+            probabilities: Model win probabilities of the settled bets
             
         Returns:
             Average Kelly stake as percentage of bankroll
         """
-        kelly_stakes = []
-        
-        for bet in bets:
-            # Kelly = (bp - q) / b
-            # where b = odds - 1, p = win probability, q = 1 - p
-            if bet.odds > 1:
-                b = bet.odds - 1
-                p = bet.model_probability
-                q = 1 - p
-                kelly = (b * p - q) / b
-                
-                # Clamp to reasonable range (0-10% of bankroll)
-                kelly = max(0, min(kelly, 0.10))
-                kelly_stakes.append(kelly)
-        
-        return np.mean(kelly_stakes) * 100 if kelly_stakes else 0.0  # As percentage
+        # Kelly = (bp - q) / b
+        # where b = odds - 1, p = win probability, q = 1 - p
+        has_edge = odds > 1
+        if not has_edge.any():
+            return 0.0
+        
+        b = odds[has_edge] - 1
+        p = probabilities[has_edge]
+        kelly = (b * p - (1 - p)) / b
+        
+        # Clamp to reasonable range (0-10% of bankroll)
+        return np.clip(kelly, 0.0, 0.10).mean() * 100  # As percentage
     
-    def _calculate_break_even_winrate(self, bets: List[Bet]) -> float:
+    def _calculate_break_even_winrate(self, odds: np.ndarray) -> float:
         """Calculate the win rate needed to break even.
         
         Break-even WR = 1 / average_odds
         
         Args:
-            bets: List of settled bets
+            odds: Odds of the settled bets
             
         Returns:
             Break-even win rate as percentage
         """
-        avg_odds = np.mean([b.odds for b in bets])
+        avg_odds = np.mean(odds)
         break_even = (1 / avg_odds * 100) if avg_odds > 0 else 0
         return break_even
     
-    def _calculate_ev_per_bet(self, bets: List[Bet]) -> float:
+    def _calculate_ev_per_bet(
+        self,
+        stakes: np.ndarray,
+        odds: np.ndarray,
+        probabilities: np.ndarray,
+    ) -> float:
         """Calculate expected value per bet.
         
-        EV = (win_prob * win_amount) - (lose_prob * lose_amount)
+        EV = (win_prob * win_amount) - (lose_prob * lose_amount),
+        which simplifies to stake * (win_prob * odds - 1)
         
         Args:
-            bets: List of settled bets
+            stakes: Stakes of the settled bets
+            odds: Odds of the settled bets
+            probabilities: Model win probabilities of the settled bets
             
         Returns:
             Average EV per bet in currency
         """
-        ev_values = []
-        
-        for bet in bets:
-            win_prob = bet.model_probability
-            lose_prob = 1 - win_prob
-            win_amount = bet.stake * (bet.odds - 1)
-            lose_amount = bet.stake
-            
-            ev = (win_prob * win_amount) - (lose_prob * lose_amount)
-            ev_values.append(ev)
+        if not stakes.size:
+            return 0.0
         
-        return np.mean(ev_values) if ev_values else 0.0
+        return (stakes * (probabilities * odds - 1)).mean()
     
-    def _build_equity_curve(self, bets: List[Bet]) -> List[Dict]:
+    def _build_equity_curve(self, profits: np.ndarray, dates: np.ndarray) -> List[Dict]:
         """Build equity curve data.
         
         Args:
-            bets: Sorted list of settled bets
+            profits: Profits of the settled bets, in settlement order
+            dates: Settlement times (datetime64), aligned with ``profits``
             
         Returns:
             List of {date, bankroll} dictionaries
         """
+        # Running bankroll as one prefix sum, starting from the initial one
+        bankrolls = np.cumsum(
+            np.concatenate(([self.initial_bankroll], np.nan_to_num(profits)))
+        )
+        
+        bankrolls = np.round(bankrolls[1:], 2).tolist()
+        
+        # ISO dates in bulk; like datetime.isoformat(), microseconds are
+        # only shown when non-zero
+        iso_dates = np.datetime_as_string(dates, unit='s')
+        has_micros = dates != dates.astype('datetime64[s]')
+        if has_micros.any():
+            iso_dates[has_micros] = np.datetime_as_string(dates[has_micros], unit='us')
+        
         equity_curve = [{'date': None, 'bankroll': self.initial_bankroll}]
-        current_bankroll = self.initial_bankroll
-        
-        for bet in bets:
-            current_bankroll += bet.profit if bet.profit else 0
-            equity_curve.append({
-                'date': bet.settled_at.isoformat() if bet.settled_at else None,
-                'bankroll': round(current_bankroll, 2)
-            })
+        equity_curve.extend(
+            {'date': date, 'bankroll': bankroll}
+            for date, bankroll in zip(iso_dates.tolist(), bankrolls)
+        )
         
         return equity_curve
     
@@ -1,19 +1,119 @@
 """Base metrics calculator class."""
-from typing import Dict, List, Optional
+import copy
+from functools import wraps
+from typing import Callable, Dict, List, Optional
 from datetime import datetime
+import numpy as np
 from database.models import Bet
+from utils.cache import TTLCache
+
+from .columns import load_bet_rows
+from .context import MetricsContext
+
+
+# Results of calculate(), shared by all calculators and keyed by the
+# calculator class, its arguments and the content of its bets
+_RESULTS_CACHE = TTLCache(max_size=128)
+
+
+def memoize_calculation(func: Callable) -> Callable:
+    """Memoize a calculator's ``calculate`` on the bets' fingerprint.
+    
+    Calculators built over the same bets (same ids, outcomes, profits,
+    odds, ...) reuse the previous result. Each call returns a copy, so
+    callers may mutate it freely.
+    
+    Args:
+        func: ``calculate`` method of a MetricsCalculator subclass
+        
+    Returns:
+        Wrapped method
+    """
+    @wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache_key = (
+            f"{type(self).__name__}:{self.fingerprint}:"
+            f"{self._cache_params()}:{args}:{sorted(kwargs.items())}"
+        )
+        
+        result = _RESULTS_CACHE.get(cache_key)
+        if result is None:
+            result = func(self, *args, **kwargs)
+            _RESULTS_CACHE.set(cache_key, result)
+        
+        return copy.deepcopy(result)
+    
+    return wrapper
 
 
 class MetricsCalculator:
     """Base class for metrics calculation."""
     
-    def __init__(self, bets: Optional[List[Bet]] = None):
+    def __init__(
+        self,
+        bets: Optional[List[Bet]] = None,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+        context: Optional[MetricsContext] = None,
+    ):
         """Initialize metrics calculator.
         
         Args:
             bets: List of bet objects to calculate metrics for
+            columns: Columns already built for ``bets`` (built from the
+                bets if None)
+            context: Context shared with other calculators over the same
+                bets; when given, ``bets`` and ``columns`` are ignored
         """
-        self.bets = bets or []
+        self.context = context if context is not None else MetricsContext(bets, columns)
+    
+    @classmethod
+    def from_query(cls, *criteria, **kwargs) -> 'MetricsCalculator':
+        """Build a calculator from a column-only query of the bets table.
+        
+        Only bet columns are selected, so no Bet (or Match) objects are
+        constructed; ``self.bets`` holds the lightweight result rows.
+        
+        Args:
+            *criteria: SQLAlchemy filter expressions (e.g. ``Bet.confirmed == True``)
+            **kwargs: Extra constructor arguments (e.g. ``initial_bankroll``)
+            
+        Returns:
+            Calculator over the matching bets
+        """
+        rows, columns = load_bet_rows(*criteria)
+        return cls(rows, columns=columns, **kwargs)
+    
+    @property
+    def bets(self) -> List[Bet]:
+        """Bets the metrics are calculated for."""
+        return self.context.bets
+    
+    @property
+    def columns(self) -> Dict[str, np.ndarray]:
+        """Bet columns, aligned with ``self.bets``."""
+        return self.context.columns
+    
+    @property
+    def fingerprint(self) -> str:
+        """Digest identifying the content of the bets."""
+        return self.context.fingerprint
+    
+    def invalidate(self):
+        """Rebuild the cached columns from ``self.bets``.
+        
+        Call this after adding, removing or updating bets in place, so
+        that metrics (and the memoized results) reflect the change. The
+        calculator stops sharing its context with other calculators.
+        """
+        self.context = MetricsContext(self.bets)
+    
+    def _cache_params(self) -> tuple:
+        """Calculator settings that affect ``calculate`` besides the bets.
+        
+        Returns:
+            Tuple included in the memoization key
+        """
+        return ()
     
     def filter_bets(
         self,
@@ -39,29 +139,46 @@ class MetricsCalculator:
         Returns:
             Filtered list of bets
         """
-        filtered = self.bets
+        columns = self.columns
+        mask = np.ones(len(self.bets), dtype=bool)
         
         if sport:
-            filtered = [b for b in filtered if hasattr(b.match, 'game') and b.match.game == sport]
+            mask &= self._select_category('game', sport)
         
         if market:
-            filtered = [b for b in filtered if b.market_type == market]
+            mask &= self._select_category('market_type', market)
         
         if confidence_range:
             min_conf, max_conf = confidence_range
-            filtered = [b for b in filtered if min_conf <= b.confidence < max_conf]
+            mask &= (columns['confidence'] >= min_conf) & (columns['confidence'] < max_conf)
         
         if odds_range:
             min_odds, max_odds = odds_range
-            filtered = [b for b in filtered if min_odds <= b.odds < max_odds]
+            mask &= (columns['odds'] >= min_odds) & (columns['odds'] < max_odds)
         
         if start_date:
-            filtered = [b for b in filtered if b.created_at >= start_date]
+            mask &= columns['created_at'] >= np.datetime64(start_date)
         
         if end_date:
-            filtered = [b for b in filtered if b.created_at <= end_date]
+            mask &= columns['created_at'] <= np.datetime64(end_date)
+        
+        return [self.bets[i] for i in np.flatnonzero(mask)]
+    
+    def _select_category(self, name: str, value) -> np.ndarray:
+        """Select the bets whose categorical column equals a value.
         
-        return filtered
+        Args:
+            name: Column name
+            value: Value to match
+            
+        Returns:
+            Boolean mask over the bets
+        """
+        keys, codes = self.context.codes(name)
+        code = keys.get(value)
+        if code is None:
+            return np.zeros(codes.size, dtype=bool)
+        return codes == code
     
     def calculate(self) -> Dict:
         """Calculate metrics. To be overridden by subclasses.
@@ -1,13 +1,14 @@
 """Basic performance metrics."""
 from typing import Dict, List
 import numpy as np
-from .base import MetricsCalculator
+from .base import MetricsCalculator, memoize_calculation
 from database.models import Bet
 
 
 class BasicMetrics(MetricsCalculator):
     """Calculate basic performance metrics."""
     
+    @memoize_calculation
     def calculate(self) -> Dict:
         """Calculate basic metrics.
         
@@ -22,7 +23,18 @@ class BasicMetrics(MetricsCalculator):
             - average_odds: Average odds
             - average_stake: Average stake
         """
-        if not self.bets:
+        return self._calculate_selected(np.ones(len(self.bets), dtype=bool))
+    
+    def _calculate_selected(self, selected: np.ndarray) -> Dict:
+        """Calculate basic metrics over a subset of the bets.
+        
+        Args:
+            selected: Boolean mask over ``self.bets``
+            
+        Returns:
+            Dictionary with the metrics described in ``calculate``
+        """
+        if not selected.any():
             return {
                 'win_rate': 0.0,
                 'roi': 0.0,
@@ -35,28 +47,29 @@ class BasicMetrics(MetricsCalculator):
             }
         
         # Filter only settled bets
-        settled_bets = [b for b in self.bets if b.status in ['won', 'lost']]
+        settled = self.context.settled_mask & selected
         
-        if not settled_bets:
+        if not settled.any():
             return {
                 'win_rate': 0.0,
                 'roi': 0.0,
                 'profit': 0.0,
                 'yield_per_bet': 0.0,
                 'total_wagered': 0.0,
-                'total_bets': len(self.bets),
-                'average_odds': np.mean([b.odds for b in self.bets]) if self.bets else 0.0,
-                'average_stake': np.mean([b.stake for b in self.bets]) if self.bets else 0.0,
+                'total_bets': int(selected.sum()),
+                'average_odds': np.mean(self.columns['odds'][selected]),
+                'average_stake': np.mean(self.columns['stake'][selected]),
             }
         
         # Calculate metrics
-        won_bets = [b for b in settled_bets if b.status == 'won']
-        total_stake = sum(b.stake for b in settled_bets)
-        total_profit = sum(b.profit for b in settled_bets if b.profit is not None)
+        settled_count = int(settled.sum())
+        stakes = self.columns['stake'][settled]
+        total_stake = float(stakes.sum())
+        total_profit = float(np.nansum(self.columns['profit'][settled]))
         
-        win_rate = len(won_bets) / len(settled_bets) if settled_bets else 0.0
+        win_rate = int((self.context.won_mask & selected).sum()) / settled_count
         roi = (total_profit / total_stake * 100) if total_stake > 0 else 0.0
-        yield_per_bet = total_profit / len(settled_bets) if settled_bets else 0.0
+        yield_per_bet = total_profit / settled_count
         
         return {
             'win_rate': round(win_rate * 100, 2),  # As percentage
@@ -64,9 +77,9 @@ class BasicMetrics(MetricsCalculator):
             'profit': round(total_profit, 2),
             'yield_per_bet': round(yield_per_bet, 2),
             'total_wagered': round(total_stake, 2),
-            'total_bets': len(settled_bets),
-            'average_odds': round(np.mean([b.odds for b in settled_bets]), 2),
-            'average_stake': round(np.mean([b.stake for b in settled_bets]), 2),
+            'total_bets': settled_count,
+            'average_odds': round(np.mean(self.columns['odds'][settled]), 2),
+            'average_stake': round(np.mean(stakes), 2),
         }
     
     def calculate_by_dimension(self, dimension: str, values: List) -> Dict:
@@ -80,24 +93,24 @@ class BasicMetrics(MetricsCalculator):
             Dictionary with metrics for each value
         """
         results = {}
+        columns = self.columns
         
         for value in values:
-            if dimension == 'sport':
-                filtered_bets = [b for b in self.bets if hasattr(b.match, 'game') and b.match.game == value]
-            elif dimension == 'market':
-                filtered_bets = [b for b in self.bets if b.market_type == value]
+            if dimension in ('sport', 'market'):
+                selected = self._select_category(
+                    'game' if dimension == 'sport' else 'market_type', value
+                )
             elif dimension == 'confidence_range':
                 min_conf, max_conf = value[:2]
-                filtered_bets = [b for b in self.bets if min_conf <= b.confidence < max_conf]
+                selected = (columns['confidence'] >= min_conf) & (columns['confidence'] < max_conf)
             elif dimension == 'odds_range':
                 min_odds, max_odds = value[:2]
-                filtered_bets = [b for b in self.bets if min_odds <= b.odds < max_odds]
+                selected = (columns['odds'] >= min_odds) & (columns['odds'] < max_odds)
             else:
-                filtered_bets = []
+                selected = np.zeros(len(self.bets), dtype=bool)
             
-            # Create new metrics calculator for filtered bets
-            calc = BasicMetrics(filtered_bets)
+            # Reduce over the cached columns instead of a new calculator
             label = value[2] if isinstance(value, tuple) and len(value) > 2 else str(value)
-            results[label] = calc.calculate()
+            results[label] = self._calculate_selected(selected)
         
         return results
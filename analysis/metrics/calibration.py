@@ -1,13 +1,13 @@
 """Calibration metrics for model assessment."""
 from typing import Dict, List, Tuple
 import numpy as np
-from .base import MetricsCalculator
-from database.models import Bet
+from .base import MetricsCalculator, memoize_calculation
 
 
 class CalibrationMetrics(MetricsCalculator):
     """Calculate model calibration metrics."""
     
+    @memoize_calculation
     def calculate(self) -> Dict:
         """Calculate calibration metrics.
         
@@ -23,35 +23,33 @@ class CalibrationMetrics(MetricsCalculator):
             return self._empty_metrics()
         
         # Filter settled bets
-        settled_bets = [b for b in self.bets if b.status in ['won', 'lost']]
+        settled = self.context.settled_mask
         
-        if not settled_bets:
+        if not settled.any():
             return self._empty_metrics()
         
         # Extract probabilities and outcomes
-        predicted_probs = []
-        actual_outcomes = []
+        predicted = self.columns['model_probability'][settled]
+        actual = self.context.won_mask[settled].astype(np.uint8)
         
-        for bet in settled_bets:
-            predicted_probs.append(bet.model_probability)
-            actual_outcomes.append(1 if bet.status == 'won' else 0)
-        
-        predicted = np.array(predicted_probs)
-        actual = np.array(actual_outcomes)
-        
-        # Brier Score
-        brier = np.mean((predicted - actual) ** 2)
+        # Brier Score (float32 is plenty for a 4-decimal mean squared error)
+        squared_error = predicted.astype(np.float32) - actual
+        np.square(squared_error, out=squared_error)
+        brier = float(squared_error.mean())
         
         # Log Loss
         epsilon = 1e-15  # To avoid log(0)
-        predicted_clipped = np.clip(predicted, epsilon, 1 - epsilon)
-        log_loss = -np.mean(actual * np.log(predicted_clipped) + (1 - actual) * np.log(1 - predicted_clipped))
+        # Outcomes are 0/1, so each bet contributes the log of the probability
+        # it gave the actual outcome; one buffer is clipped and logged in place
+        outcome_prob = np.where(actual == 1, predicted, 1 - predicted)
+        np.clip(outcome_prob, epsilon, 1 - epsilon, out=outcome_prob)
+        log_loss = -np.mean(np.log(outcome_prob, out=outcome_prob))
         
         # Calibration Error (binned)
         calibration_error, calibration_bins = self._calculate_calibration_error(predicted, actual)
         
         # Overround Beat Rate
-        overround_beat_rate = self._calculate_overround_beat_rate(settled_bets)
+        overround_beat_rate = self._calculate_overround_beat_rate(self.columns['edge'][settled])
         
         return {
             'brier_score': round(brier, 4),
@@ -78,52 +76,55 @@ class CalibrationMetrics(MetricsCalculator):
             Tuple of (calibration_error, bin_data)
         """
         bins = np.linspace(0, 1, n_bins + 1)
-        bin_data = []
-        total_error = 0
-        total_count = 0
         
-        for i in range(n_bins):
-            # Find predictions in this bin
-            in_bin = (predicted >= bins[i]) & (predicted < bins[i + 1])
-            
-            if np.sum(in_bin) > 0:
-                bin_predicted = np.mean(predicted[in_bin])
-                bin_actual = np.mean(actual[in_bin])
-                bin_count = np.sum(in_bin)
-                bin_error = abs(bin_predicted - bin_actual)
-                
-                total_error += bin_error * bin_count
-                total_count += bin_count
-                
-                bin_data.append({
-                    'bin_start': bins[i],
-                    'bin_end': bins[i + 1],
-                    'predicted': bin_predicted,
-                    'actual': bin_actual,
-                    'count': int(bin_count),
-                    'error': bin_error,
-                })
-        
-        ece = total_error / total_count if total_count > 0 else 0
+        # Bin i holds bins[i] <= p < bins[i + 1]; anything outside [0, 1)
+        # falls in the overflow bucket n_bins and is ignored
+        bin_index = np.searchsorted(bins, predicted, side='right') - 1
+        bin_index[(bin_index < 0) | (bin_index >= n_bins)] = n_bins
+        
+        counts = np.bincount(bin_index, minlength=n_bins + 1)[:n_bins]
+        predicted_sums = np.bincount(bin_index, weights=predicted, minlength=n_bins + 1)[:n_bins]
+        actual_sums = np.bincount(bin_index, weights=actual, minlength=n_bins + 1)[:n_bins]
+        
+        filled = np.flatnonzero(counts)
+        bin_counts = counts[filled]
+        bin_predicted = predicted_sums[filled] / bin_counts
+        bin_actual = actual_sums[filled] / bin_counts
+        bin_error = np.abs(bin_predicted - bin_actual)
+        
+        bin_data = [
+            {
+                'bin_start': bins[i],
+                'bin_end': bins[i + 1],
+                'predicted': bin_predicted[j],
+                'actual': bin_actual[j],
+                'count': int(bin_counts[j]),
+                'error': bin_error[j],
+            }
+            for j, i in enumerate(filled)
+        ]
+        
+        total_count = bin_counts.sum()
+        ece = (bin_error * bin_counts).sum() / total_count if total_count > 0 else 0
         return ece, bin_data
     
-    def _calculate_overround_beat_rate(self, bets: List[Bet]) -> float:
+    def _calculate_overround_beat_rate(self, edges: np.ndarray) -> float:
         """Calculate how often we beat the bookmaker's margin.
         
         The overround (bookmaker margin) is when the sum of implied probabilities
         exceeds 1.0. We beat it when our edge is positive.
         
         Args:
-            bets: List of settled bets
+            edges: Edges of the settled bets
             
         Returns:
             Percentage of bets with positive edge
         """
-        if not bets:
+        if not edges.size:
             return 0.0
         
-        positive_edge_count = sum(1 for bet in bets if bet.edge > 0)
-        return (positive_edge_count / len(bets)) * 100
+        positive_edge_count = int((edges > 0).sum())
+        return (positive_edge_count / edges.size) * 100
     
     def _empty_metrics(self) -> Dict:
         """Return empty metrics dictionary."""
@@ -1,13 +1,14 @@
 """Closing Line Value (CLV) metrics."""
-from typing import Dict, List
+from typing import Dict
 import numpy as np
-from .base import MetricsCalculator
-from database.models import Bet
+from .base import MetricsCalculator, memoize_calculation
+from .columns import group_mean
 
 
 class CLVMetrics(MetricsCalculator):
     """Calculate Closing Line Value metrics."""
     
+    @memoize_calculation
     def calculate(self) -> Dict:
         """Calculate CLV metrics.
         
@@ -24,30 +25,39 @@ class CLVMetrics(MetricsCalculator):
             return self._empty_metrics()
         
         # Filter bets with CLV data
-        bets_with_clv = [b for b in self.bets if b.clv is not None and b.closing_odds is not None]
+        has_clv = ~np.isnan(self.columns['clv']) & ~np.isnan(self.columns['closing_odds'])
         
-        if not bets_with_clv:
+        if not has_clv.any():
             return self._empty_metrics()
         
         # Calculate average CLV
-        clv_values = [b.clv for b in bets_with_clv]
+        clv_values = self.columns['clv'][has_clv]
         clv_average = np.mean(clv_values)
         
         # Positive CLV rate
-        positive_clv_count = sum(1 for clv in clv_values if clv > 0)
-        clv_positive_rate = (positive_clv_count / len(clv_values)) * 100
+        positive_clv_count = int((clv_values > 0).sum())
+        clv_positive_rate = (positive_clv_count / clv_values.size) * 100
         
         # CLV by sport
-        clv_by_sport = self._calculate_clv_by_dimension(bets_with_clv, 'sport')
+        games = self.columns['game'][has_clv]
+        games[games == None] = 'Unknown'
+        clv_by_sport = self._calculate_clv_by_dimension(games, clv_values)
         
         # CLV by market
-        clv_by_market = self._calculate_clv_by_dimension(bets_with_clv, 'market')
+        clv_by_market = self._calculate_clv_by_dimension(
+            self.columns['market_type'][has_clv], clv_values
+        )
         
         # CLV correlation with results
-        clv_correlation = self._calculate_clv_correlation(bets_with_clv)
+        settled = self.context.settled_mask[has_clv]
+        clv_correlation = self._calculate_clv_correlation(
+            clv_values[settled], self.context.won_mask[has_clv][settled]
+        )
         
         # Edge realized
-        edge_realized = self._calculate_edge_realized(bets_with_clv)
+        edge_realized = self._calculate_edge_realized(
+            has_clv & self.context.settled_mask & ~np.isnan(self.columns['profit'])
+        )
         
         return {
             'clv_average': round(clv_average, 4),
@@ -58,77 +68,69 @@ class CLVMetrics(MetricsCalculator):
             'edge_realized': round(edge_realized, 2),
         }
     
-    def _calculate_clv_by_dimension(self, bets: List[Bet], dimension: str) -> Dict:
+    def _calculate_clv_by_dimension(self, keys: np.ndarray, clv_values: np.ndarray) -> Dict:
         """Calculate average CLV by a dimension.
         
         Args:
-            bets: List of bets with CLV
-            dimension: 'sport' or 'market'
+            keys: Dimension value (sport or market) of each bet with CLV
+            clv_values: CLV of each bet, aligned with ``keys``
             
         Returns:
-            Dictionary mapping dimension values to average CLV
+            Dictionary mapping dimension values to average CLV, in order
+            of first appearance
         """
-        dimension_map = {}
-        
-        for bet in bets:
-            if dimension == 'sport':
-                key = bet.match.game if hasattr(bet.match, 'game') else 'Unknown'
-            elif dimension == 'market':
-                key = bet.market_type
-            else:
-                continue
-            
-            if key not in dimension_map:
-                dimension_map[key] = []
-            dimension_map[key].append(bet.clv)
+        if not keys.size:
+            return {}
+        
+        uniques, first_seen, codes = np.unique(keys, return_index=True, return_inverse=True)
+        means = group_mean(codes, clv_values, uniques.size)
         
         return {
-            key: round(np.mean(values), 4)
-            for key, values in dimension_map.items()
+            uniques[code]: round(means[code], 4)
+            for code in np.argsort(first_seen)
         }
     
-    def _calculate_clv_correlation(self, bets: List[Bet]) -> float:
+    def _calculate_clv_correlation(self, clv_values: np.ndarray, won: np.ndarray) -> float:
         """Calculate correlation between CLV and bet outcome.
         
         Args:
-            bets: List of bets with CLV
+            clv_values: CLV of the settled bets
+            won: Whether each settled bet was won
             
         Returns:
             Correlation coefficient
         """
-        settled_bets = [b for b in bets if b.status in ['won', 'lost']]
-        
-        if len(settled_bets) < 2:
+        if clv_values.size < 2:
             return 0.0
         
-        clv_values = [b.clv for b in settled_bets]
-        outcomes = [1 if b.status == 'won' else 0 for b in settled_bets]
+        # Pearson correlation in closed form (no 2x2 covariance matrix)
+        clv_dev = clv_values - clv_values.mean()
+        outcome_dev = won - won.mean()
+        with np.errstate(divide='ignore', invalid='ignore'):
+            correlation = (clv_dev * outcome_dev).sum() / np.sqrt(
+                (clv_dev * clv_dev).sum() * (outcome_dev * outcome_dev).sum()
+            )
         
-        # Calculate Pearson correlation
-        correlation = np.corrcoef(clv_values, outcomes)[0, 1]
-        
-        return correlation if not np.isnan(correlation) else 0.0
+        return float(np.clip(correlation, -1.0, 1.0)) if not np.isnan(correlation) else 0.0
     
-    def _calculate_edge_realized(self, bets: List[Bet]) -> float:
+    def _calculate_edge_realized(self, settled: np.ndarray) -> float:
         """Calculate how much of theoretical edge was realized.
         
         Args:
-            bets: List of bets with CLV
+            settled: Mask of the settled bets with CLV and a recorded profit
             
         Returns:
             Percentage of edge realized
         """
-        settled_bets = [b for b in bets if b.status in ['won', 'lost'] and b.profit is not None]
-        
-        if not settled_bets:
+        if not settled.any():
             return 0.0
         
         # Theoretical edge (average)
-        theoretical_edge = np.mean([b.edge for b in settled_bets])
+        theoretical_edge = np.mean(self.columns['edge'][settled])
         
         # Realized edge (actual ROI)
-        total_stake = sum(b.stake for b in settled_bets)
-        total_profit = sum(b.profit for b in settled_bets)
+        total_stake = float(self.columns['stake'][settled].sum())
+        total_profit = float(self.columns['profit'][settled].sum())
         realized_edge = (total_profit / total_stake) if total_stake > 0 else 0
         
         # Percentage of theoretical edge achieved
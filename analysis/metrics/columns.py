@@ -0,0 +1,166 @@
+"""Columnar (structure-of-arrays) views of bets for vectorized metrics."""
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple
+import numpy as np
+from database.db import get_db
+from database.models import Bet, Match
+
+
+# Column name -> NumPy dtype. Missing numeric values become NaN and
+# missing datetimes NaT; strings are kept as object arrays.
+BET_COLUMNS = {
+    'id': np.int64,
+    'stake': np.float64,
+    'odds': np.float64,
+    'profit': np.float64,
+    'model_probability': np.float64,
+    'edge': np.float64,
+    'confidence': np.float64,
+    'clv': np.float64,
+    'closing_odds': np.float64,
+    'status': object,
+    'bookmaker': object,
+    'market_type': object,
+    'game': object,
+    'settled_at': 'datetime64[us]',
+    'created_at': 'datetime64[us]',
+}
+
+# Rows fetched per round trip when streaming columns from the database
+_CHUNK_SIZE = 4096
+
+
+def _to_columns(rows: List[tuple], names: Sequence[str]) -> Dict[str, np.ndarray]:
+    """Transpose row tuples into one array per column.
+    
+    Args:
+        rows: Row tuples, one value per name
+        names: Column names, in row order
+    
+    Returns:
+        Dictionary mapping column name to array
+    """
+    if not rows:
+        return {name: np.empty(0, dtype=BET_COLUMNS[name]) for name in names}
+    
+    return {
+        name: np.array(values, dtype=BET_COLUMNS[name])
+        for name, values in zip(names, zip(*rows))
+    }
+
+
+def _bet_value(bet: Bet, name: str):
+    """Read one column value from a Bet object (or a row of bet columns)."""
+    if name == 'game':
+        match = getattr(bet, 'match', None)
+        if match is None:
+            return getattr(bet, 'game', None)
+        return getattr(match, 'game', None)
+    return getattr(bet, name)
+
+
+def columns_from_bets(
+    bets: Iterable[Bet],
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Build columns from already-loaded Bet objects.
+    
+    Args:
+        bets: Bet objects
+        names: Columns to build (all of ``BET_COLUMNS`` if None)
+    
+    Returns:
+        Dictionary mapping column name to array aligned with ``bets``
+    """
+    names = list(names or BET_COLUMNS)
+    rows = [tuple(_bet_value(b, name) for name in names) for b in bets]
+    return _to_columns(rows, names)
+
+
+def group_mean(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Average values per group in a single pass.
+    
+    Args:
+        codes: Group code (0 <= code < n_groups) of each value
+        values: Values to average, aligned with ``codes``
+        n_groups: Number of groups
+    
+    Returns:
+        Mean of each group (NaN for groups without values)
+    """
+    sums = np.bincount(codes, weights=values, minlength=n_groups)
+    counts = np.bincount(codes, minlength=n_groups)
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return sums / counts
+
+
+def _bet_columns_query(db, names: Sequence[str]):
+    """Build a query selecting the given bet columns.
+    
+    Args:
+        db: Database session
+        names: Column names (``game`` comes from the bet's match)
+    
+    Returns:
+        Query yielding one row per bet, with attributes named as ``names``
+    """
+    selected = [Match.game if name == 'game' else getattr(Bet, name) for name in names]
+    
+    query = db.query(*selected).select_from(Bet)
+    if 'game' in names:
+        query = query.outerjoin(Match, Bet.match_id == Match.id)
+    return query
+
+
+def load_bet_columns(
+    *criteria,
+    names: Optional[Sequence[str]] = None,
+) -> Dict[str, np.ndarray]:
+    """Load bet columns straight from the database.
+    
+    Only the requested columns are selected, so no Bet objects are
+    hydrated. Rows are streamed in chunks of ``_CHUNK_SIZE`` and each
+    chunk is converted to arrays as it arrives, so the full result is
+    never held as Python tuples.
+    
+    Args:
+        *criteria: SQLAlchemy filter expressions (e.g. ``Bet.confirmed == True``)
+        names: Columns to load (all of ``BET_COLUMNS`` if None)
+    
+    Returns:
+        Dictionary mapping column name to array
+    """
+    names = list(names or BET_COLUMNS)
+    
+    with get_db() as db:
+        result = db.execute(
+            _bet_columns_query(db, names).filter(*criteria).statement,
+            execution_options={'yield_per': _CHUNK_SIZE},
+        )
+        chunks = [_to_columns(rows, names) for rows in result.partitions()]
+    
+    if len(chunks) <= 1:
+        return chunks[0] if chunks else _to_columns([], names)
+    
+    return {name: np.concatenate([c[name] for c in chunks]) for name in names}
+
+
+def load_bet_rows(*criteria) -> Tuple[List, Dict[str, np.ndarray]]:
+    """Load every bet column as lightweight rows plus their arrays.
+    
+    The rows expose the columns as attributes (``row.stake``,
+    ``row.game``, ...) and stand in for Bet objects where a list of
+    bets is still needed, without hydrating ORM instances.
+    
+    Args:
+        *criteria: SQLAlchemy filter expressions
+    
+    Returns:
+        Tuple of (rows ordered by bet id, dictionary mapping column name
+        to array)
+    """
+    names = list(BET_COLUMNS)
+    
+    with get_db() as db:
+        rows = _bet_columns_query(db, names).filter(*criteria).order_by(Bet.id).all()
+    
+    return rows, _to_columns(rows, names)
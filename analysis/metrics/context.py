@@ -0,0 +1,106 @@
+"""Shared bet columns and derived views for metrics calculators."""
+import hashlib
+from typing import Dict, List, Optional, Tuple
+import numpy as np
+from database.models import Bet
+
+from .columns import columns_from_bets
+
+
+class MetricsContext:
+    """Columns of a bet set plus the views every calculator needs.
+    
+    Building the columns, the settled masks, the settlement order and the
+    fingerprint once per bet set lets all calculators over that set share
+    them instead of each re-filtering and re-sorting the bets.
+    """
+    
+    def __init__(
+        self,
+        bets: Optional[List[Bet]] = None,
+        columns: Optional[Dict[str, np.ndarray]] = None,
+    ):
+        """Initialize the context.
+        
+        Args:
+            bets: List of bet objects
+            columns: Columns already built for ``bets`` (built from the
+                bets if None)
+        """
+        self.bets = bets or []
+        
+        # Bet attributes as NumPy columns (see columns.BET_COLUMNS), built
+        # once so calculators reduce over arrays instead of Bet objects
+        self.columns = columns if columns is not None else columns_from_bets(self.bets)
+        
+        status = self.columns['status']
+        self.won_mask = status == 'won'
+        self.settled_mask = self.won_mask | (status == 'lost')
+        
+        self._settled_order = None
+        self._fingerprint = None
+        self._codes = {}
+    
+    @property
+    def settled_order(self) -> np.ndarray:
+        """Indices of the settled bets that have a settlement time.
+        
+        Sorted by ``settled_at`` (stable), computed on first use.
+        """
+        if self._settled_order is None:
+            settled_at = self.columns['settled_at']
+            settled = np.flatnonzero(self.settled_mask & ~np.isnat(settled_at))
+            self._settled_order = settled[np.argsort(settled_at[settled], kind='stable')]
+        return self._settled_order
+    
+    @property
+    def fingerprint(self) -> str:
+        """Digest of every bet column, identifying the bet set's content."""
+        if self._fingerprint is None:
+            digest = hashlib.blake2b(digest_size=16)
+            for name, values in self.columns.items():
+                digest.update(name.encode())
+                if values.dtype == object:
+                    digest.update('\x1f'.join(map(str, values)).encode())
+                else:
+                    digest.update(values.tobytes())
+            self._fingerprint = digest.hexdigest()
+        return self._fingerprint
+    
+    def codes(self, name: str) -> Tuple[Dict, np.ndarray]:
+        """Integer codes of a categorical column, computed on first use.
+        
+        Comparing codes is much cheaper than comparing the object column
+        itself, so repeated per-value selections should go through them.
+        
+        Args:
+            name: Column name (e.g. ``game`` or ``market_type``)
+            
+        Returns:
+            Tuple of (mapping of value to code, code of each bet)
+        """
+        if name not in self._codes:
+            keys = {}
+            codes = np.fromiter(
+                (keys.setdefault(value, len(keys)) for value in self.columns[name]),
+                dtype=np.int64,
+                count=len(self.columns[name]),
+            )
+            self._codes[name] = (keys, codes)
+        return self._codes[name]
+    
+    def subset(self, indices: np.ndarray) -> 'MetricsContext':
+        """Build the context of a subset of the bets.
+        
+        The columns are sliced rather than rebuilt from the Bet objects.
+        
+        Args:
+            indices: Positions in ``self.bets``
+            
+        Returns:
+            Context over the selected bets, in the given order
+        """
+        return MetricsContext(
+            [self.bets[i] for i in indices],
+            {name: values[indices] for name, values in self.columns.items()},
+        )
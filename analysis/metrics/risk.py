@@ -1,13 +1,13 @@
 """Risk metrics calculation."""
-from typing import Dict, List
+from typing import Dict
 import numpy as np
-from .base import MetricsCalculator
-from database.models import Bet
+from .base import MetricsCalculator, memoize_calculation
 
 
 class RiskMetrics(MetricsCalculator):
     """Calculate risk-related metrics."""
     
+    @memoize_calculation
     def calculate(self, risk_free_rate: float = 0.0) -> Dict:
         """Calculate risk metrics.
         
@@ -30,61 +30,54 @@ class RiskMetrics(MetricsCalculator):
             return self._empty_metrics()
         
         # Filter settled bets and sort by date
-        settled_bets = sorted(
-            [b for b in self.bets if b.status in ['won', 'lost'] and b.settled_at],
-            key=lambda x: x.settled_at
-        )
+        order = self.context.settled_order
         
-        if not settled_bets:
+        if not order.size:
             return self._empty_metrics()
         
-        # Calculate returns and equity curve
-        returns = []
-        equity_curve = [0]
-        cumulative_equity = 0
+        settled_at = self.columns['settled_at'][order]
+        stakes = self.columns['stake'][order]
+        profits = np.nan_to_num(self.columns['profit'][order])
         
-        for bet in settled_bets:
-            ret = (bet.profit / bet.stake) if bet.stake > 0 else 0
-            returns.append(ret)
-            cumulative_equity += bet.profit
-            equity_curve.append(cumulative_equity)
+        # Calculate returns and equity curve
+        returns_array = np.divide(
+            profits, stakes, out=np.zeros_like(profits), where=stakes > 0
+        )
+        equity_curve = np.cumsum(np.concatenate(([0.0], profits)))
+        cumulative_equity = equity_curve[-1]
         
-        returns_array = np.array(returns)
+        mean_return, std_return, downside_std = self._calculate_return_stats(returns_array)
         
         # Sharpe Ratio
-        excess_returns = returns_array - (risk_free_rate / 252)  # Daily risk-free rate
-        sharpe = (np.mean(excess_returns) / np.std(returns_array)) if np.std(returns_array) > 0 else 0
+        mean_excess = mean_return - (risk_free_rate / 252)  # Daily risk-free rate
+        sharpe = (mean_excess / std_return) if std_return > 0 else 0
         sharpe = sharpe * np.sqrt(252)  # Annualize
         
         # Sortino Ratio (only downside deviation)
-        downside_returns = returns_array[returns_array < 0]
-        downside_std = np.std(downside_returns) if len(downside_returns) > 0 else 0
-        sortino = (np.mean(excess_returns) / downside_std) if downside_std > 0 else 0
+        sortino = (mean_excess / downside_std) if downside_std > 0 else 0
         sortino = sortino * np.sqrt(252)  # Annualize
         
         # Max Drawdown
-        max_dd, max_dd_duration = self._calculate_max_drawdown(equity_curve, settled_bets)
+        max_dd, max_dd_duration = self._calculate_max_drawdown(equity_curve, settled_at)
         
         # Recovery Factor
         total_profit = cumulative_equity
         recovery = (total_profit / abs(max_dd)) if max_dd < 0 else 0
         
         # Calmar Ratio (annualized ROI / max DD)
-        total_stake = sum(b.stake for b in settled_bets)
+        total_stake = stakes.sum()
         roi = (total_profit / total_stake) if total_stake > 0 else 0
         
         # Estimate annualized ROI
-        days = (settled_bets[-1].settled_at - settled_bets[0].settled_at).days
+        days = (settled_at[-1] - settled_at[0]) // np.timedelta64(1, 'D')
         annualized_roi = (roi * 365 / days) if days > 0 else roi
         calmar = (annualized_roi / abs(max_dd)) if max_dd < 0 else 0
         
         # Volatility
-        volatility = np.std(returns_array) * np.sqrt(252)  # Annualized
+        volatility = std_return * np.sqrt(252)  # Annualized
         
         # VaR and CVaR (95% confidence)
-        var_95 = np.percentile(returns_array, 5)
-        worst_5_percent = returns_array[returns_array <= var_95]
-        cvar_95 = np.mean(worst_5_percent) if len(worst_5_percent) > 0 else var_95
+        var_95, cvar_95 = self._calculate_var_cvar(returns_array, 5)
         
         return {
             'sharpe_ratio': round(sharpe, 3),
@@ -98,12 +91,71 @@ class RiskMetrics(MetricsCalculator):
             'cvar_95': round(cvar_95 * 100, 2),  # As percentage
         }
     
-    def _calculate_max_drawdown(self, equity_curve: List[float], bets: List[Bet]) -> tuple:
+    def _calculate_return_stats(self, returns: np.ndarray) -> tuple:
+        """Calculate the mean, std and downside std of returns together.
+        
+        The mean and the squared deviations are computed once and shared
+        by Sharpe, Sortino and volatility, instead of each metric making
+        its own passes over the returns.
+        
+        Args:
+            returns: Per-bet returns
+            
+        Returns:
+            Tuple of (mean, std, downside_std); the downside std is the
+            std of the negative returns (0 if there are none)
+        """
+        mean = returns.mean()
+        std = np.sqrt(np.square(returns - mean).mean())
+        
+        downside = returns[returns < 0]
+        if not downside.size:
+            return mean, std, 0.0
+        downside_std = np.sqrt(np.square(downside - downside.mean()).mean())
+        
+        return mean, std, downside_std
+    
+    def _calculate_var_cvar(self, returns: np.ndarray, percentile: float) -> tuple:
+        """Calculate Value at Risk and Conditional VaR.
+        
+        VaR is the linearly interpolated percentile (as ``np.percentile``);
+        CVaR is the mean of the returns at or below it. Both come from one
+        ``np.partition`` around the two order statistics the percentile
+        falls between, so the returns are never fully sorted.
+        
+        Args:
+            returns: Per-bet returns
+            percentile: Tail percentile (5 for 95% confidence)
+            
+        Returns:
+            Tuple of (var, cvar)
+        """
+        position = percentile / 100 * (returns.size - 1)
+        lower = int(position)
+        upper = min(lower + 1, returns.size - 1)
+        
+        partitioned = np.partition(returns, [lower, upper])
+        low_value, high_value = partitioned[lower], partitioned[upper]
+        var = low_value + (high_value - low_value) * (position - lower)
+        
+        # Everything left of ``lower`` is <= var; ties may sit to its right
+        ties = partitioned[lower + 1:]
+        ties = ties[ties <= var]
+        tail_sum = partitioned[:lower + 1].sum() + ties.sum()
+        
+        return var, tail_sum / (lower + 1 + ties.size)
+    
+    def _calculate_max_drawdown(self, equity_curve: np.ndarray, settled_at: np.ndarray) -> tuple:
         """Calculate maximum drawdown and its duration.
         
+        The drawdown at each point is measured from the running peak of
+        the equity curve (no drawdown while the peak is still 0). The
+        duration is the longest span, within one peak, from the first to
+        the latest bet that set a new maximum drawdown.
+        
         Args:
-            equity_curve: List of cumulative equity values
-            bets: Sorted list of bets
+            equity_curve: Cumulative equity, starting at 0 before the first bet
+            settled_at: Settlement times (datetime64) of the sorted bets
             
         Returns:
             Tuple of (max_drawdown_percent, duration_days)
@@ -111,28 +163,29 @@ class RiskMetrics(MetricsCalculator):
         if len(equity_curve) < 2:
             return 0.0, 0
         
-        peak = equity_curve[0]
-        max_dd = 0.0
-        max_dd_duration = 0
-        current_dd_start = None
-        
-        for i, equity in enumerate(equity_curve):
-            if equity > peak:
-                peak = equity
-                current_dd_start = None
-            else:
-                dd = ((equity - peak) / abs(peak)) * 100 if peak != 0 else 0
-                
-                if dd < max_dd:
-                    max_dd = dd
-                    if current_dd_start is None and i > 0:
-                        current_dd_start = bets[i-1].settled_at if i-1 < len(bets) else None
-                    
-                    if current_dd_start and i-1 < len(bets):
-                        duration = (bets[i-1].settled_at - current_dd_start).days
-                        max_dd_duration = max(max_dd_duration, duration)
-        
-        return max_dd, max_dd_duration
+        peak = np.maximum.accumulate(equity_curve)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            drawdown = np.where(peak != 0, (equity_curve - peak) / np.abs(peak) * 100, 0.0)
+        
+        # Points that set a new maximum drawdown
+        running_max_dd = np.minimum.accumulate(np.minimum(drawdown, 0.0))
+        is_record = drawdown[1:] < running_max_dd[:-1]
+        if not is_record.any():
+            return 0.0, 0
+        
+        records = np.flatnonzero(is_record) + 1
+        
+        # A strictly higher peak starts a new drawdown period; each record
+        # is measured from the first record of its period
+        new_peak = np.concatenate(([False], equity_curve[1:] > peak[:-1]))
+        period = np.cumsum(new_peak)[records]
+        first = np.concatenate(([True], period[1:] != period[:-1]))
+        starts = np.maximum.accumulate(np.where(first, np.arange(records.size), 0))
+        
+        record_times = settled_at[records - 1]
+        durations = (record_times - record_times[starts]) // np.timedelta64(1, 'D')
+        
+        return float(drawdown[records[-1]]), int(durations.max())
     
     def _empty_metrics(self) -> Dict:
         """Return empty metrics dictionary."""
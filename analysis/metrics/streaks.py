@@ -1,13 +1,61 @@
 """Streaks and consistency metrics."""
-from typing import Dict, List, Tuple
-from datetime import datetime, timedelta
-from .base import MetricsCalculator
-from database.models import Bet
+from typing import Dict, Tuple
+import numpy as np
+from utils.helpers import get_streak_runs
+from .base import MetricsCalculator, memoize_calculation
+
+
+def _streaks_kernel(
+    won: np.ndarray,
+) -> Tuple[int, int, bool, int, float, float, float, float]:
+    """Scan a sorted won/lost sequence once for streak statistics.
+    
+    Args:
+        won: Boolean array, True for a won bet, in settlement order
+        
+    Returns:
+        Tuple of (longest_win, longest_lose, current_is_win, current_count,
+        win_after_loss, win_after_win, avg_win, avg_lose); win_after_loss
+        and win_after_win are percentages
+    """
+    if won.size == 0:
+        return 0, 0, False, 0, 0.0, 0.0, 0.0, 0.0
+    
+    lengths, run_won = get_streak_runs(won)
+    
+    win_runs = lengths[run_won]
+    lose_runs = lengths[~run_won]
+    longest_win = int(win_runs.max(initial=0))
+    longest_lose = int(lose_runs.max(initial=0))
+    avg_win = float(win_runs.mean()) if win_runs.size else 0.0
+    avg_lose = float(lose_runs.mean()) if lose_runs.size else 0.0
+    
+    # Outcome transitions between consecutive bets
+    previous, following = won[:-1], won[1:]
+    after_win = int(previous.sum())
+    after_loss = previous.size - after_win
+    wins_after_win = int((previous & following).sum())
+    wins_after_loss = int((~previous & following).sum())
+    
+    win_after_loss = wins_after_loss / after_loss * 100 if after_loss else 0.0
+    win_after_win = wins_after_win / after_win * 100 if after_win else 0.0
+    
+    return (
+        longest_win,
+        longest_lose,
+        bool(run_won[-1]),
+        int(lengths[-1]),
+        win_after_loss,
+        win_after_win,
+        avg_win,
+        avg_lose,
+    )
 
 
 class StreakMetrics(MetricsCalculator):
     """Calculate streak and consistency metrics."""
     
+    @memoize_calculation
     def calculate(self) -> Dict:
         """Calculate streak metrics.
         
@@ -26,25 +74,34 @@ class StreakMetrics(MetricsCalculator):
             return self._empty_metrics()
         
         # Filter and sort settled bets
-        settled_bets = sorted(
-            [b for b in self.bets if b.status in ['won', 'lost'] and b.settled_at],
-            key=lambda x: x.settled_at
-        )
+        order = self.context.settled_order
         
-        if not settled_bets:
+        if not order.size:
             return self._empty_metrics()
         
-        # Calculate streaks
-        current_streak = self._get_current_streak(settled_bets)
-        longest_win, longest_lose = self._get_longest_streaks(settled_bets)
-        avg_win_streak, avg_lose_streak = self._get_average_streaks(settled_bets)
-        
-        # Win rate after outcomes
-        win_after_loss = self._calculate_win_after_outcome(settled_bets, 'lost')
-        win_after_win = self._calculate_win_after_outcome(settled_bets, 'won')
+        # Current/longest/average streaks and win rate after outcomes from
+        # one run-length encoding
+        won = self.context.won_mask[order]
+        (
+            longest_win,
+            longest_lose,
+            current_is_win,
+            current_count,
+            win_after_loss,
+            win_after_win,
+            avg_win_streak,
+            avg_lose_streak,
+        ) = _streaks_kernel(won)
+        current_streak = {
+            'type': 'win' if current_is_win else 'loss',
+            'count': current_count,
+        }
         
         # Consecutive profitable days
-        consecutive_days = self._calculate_consecutive_profitable_days(settled_bets)
+        consecutive_days = self._calculate_consecutive_profitable_days(
+            self.columns['settled_at'][order].astype('datetime64[D]'),
+            np.nan_to_num(self.columns['profit'][order]),
+        )
         
         return {
             'current_streak': current_streak,
@@ -57,159 +114,39 @@ class StreakMetrics(MetricsCalculator):
             'consecutive_profitable_days': consecutive_days,
         }
     
-    def _get_current_streak(self, bets: List[Bet]) -> Dict:
-        """Get current win/loss streak.
-        
-        Args:
-            bets: Sorted list of settled bets
-            
-        Returns:
-            Dictionary with streak type and count
-        """
-        if not bets:
-            return {'type': 'none', 'count': 0}
-        
-        # Start from most recent bet
-        current_status = bets[-1].status
-        count = 1
-        
-        for bet in reversed(bets[:-1]):
-            if bet.status == current_status:
-                count += 1
-            else:
-                break
-        
-        return {
-            'type': 'win' if current_status == 'won' else 'loss',
-            'count': count
-        }
-    
-    def _get_longest_streaks(self, bets: List[Bet]) -> Tuple[int, int]:
-        """Get longest win and loss streaks.
-        
-        Args:
-            bets: Sorted list of settled bets
-            
-        Returns:
-            Tuple of (longest_win_streak, longest_lose_streak)
-        """
-        if not bets:
-            return 0, 0
-        
-        longest_win = 0
-        longest_lose = 0
-        current_win = 0
-        current_lose = 0
-        
-        for bet in bets:
-            if bet.status == 'won':
-                current_win += 1
-                current_lose = 0
-                longest_win = max(longest_win, current_win)
-            else:
-                current_lose += 1
-                current_win = 0
-                longest_lose = max(longest_lose, current_lose)
-        
-        return longest_win, longest_lose
-    
-    def _get_average_streaks(self, bets: List[Bet]) -> Tuple[float, float]:
-        """Calculate average streak lengths.
-        
-        Args:
-            bets: Sorted list of settled bets
-            
-        Returns:
-            Tuple of (avg_win_streak, avg_lose_streak)
-        """
-        if not bets:
-            return 0.0, 0.0
-        
-        win_streaks = []
-        lose_streaks = []
-        current_streak = 0
-        current_type = None
-        
-        for bet in bets:
-            if current_type == bet.status:
-                current_streak += 1
-            else:
-                if current_type == 'won' and current_streak > 0:
-                    win_streaks.append(current_streak)
-                elif current_type == 'lost' and current_streak > 0:
-                    lose_streaks.append(current_streak)
-                
-                current_type = bet.status
-                current_streak = 1
-        
-        # Add final streak
-        if current_type == 'won' and current_streak > 0:
-            win_streaks.append(current_streak)
-        elif current_type == 'lost' and current_streak > 0:
-            lose_streaks.append(current_streak)
-        
-        avg_win = sum(win_streaks) / len(win_streaks) if win_streaks else 0.0
-        avg_lose = sum(lose_streaks) / len(lose_streaks) if lose_streaks else 0.0
-        
-        return avg_win, avg_lose
-    
-    def _calculate_win_after_outcome(self, bets: List[Bet], previous_outcome: str) -> float:
-        """Calculate win rate after a specific outcome.
-        
-        Args:
-            bets: Sorted list of settled bets
-            previous_outcome: 'won' or 'lost'
-            
-        Returns:
-            Win rate percentage
-        """
-        if len(bets) < 2:
-            return 0.0
-        
-        total_after = 0
-        wins_after = 0
-        
-        for i in range(1, len(bets)):
-            if bets[i-1].status == previous_outcome:
-                total_after += 1
-                if bets[i].status == 'won':
-                    wins_after += 1
-        
-        return (wins_after / total_after * 100) if total_after > 0 else 0.0
-    
-    def _calculate_consecutive_profitable_days(self, bets: List[Bet]) -> int:
+    def _calculate_consecutive_profitable_days(
+        self,
+        days: np.ndarray,
+        profits: np.ndarray,
+    ) -> int:
         """Calculate longest streak of consecutive profitable days.
         
+        Days without settled bets break a streak, like unprofitable days.
+        
         Args:
-            bets: Sorted list of settled bets
+            days: Settlement day (datetime64[D]) of each settled bet, sorted
+            profits: Profit of each settled bet (0 where missing)
             
         Returns:
             Number of consecutive profitable days
         """
-        if not bets:
+        if not days.size:
             return 0
         
-        # Group bets by day
-        daily_profits = {}
-        for bet in bets:
-            day = bet.settled_at.date()
-            if day not in daily_profits:
-                daily_profits[day] = 0
-            daily_profits[day] += bet.profit if bet.profit else 0
-        
-        # Find longest consecutive profitable days
-        sorted_days = sorted(daily_profits.keys())
-        max_consecutive = 0
-        current_consecutive = 0
+        # Bets are in settlement order, so each day's bets are contiguous
+        day_starts = np.flatnonzero(np.concatenate(([True], days[1:] != days[:-1])))
+        bet_days = days[day_starts]
+        profitable = np.add.reduceat(profits, day_starts) > 0
         
-        for i, day in enumerate(sorted_days):
-            if daily_profits[day] > 0:
-                current_consecutive += 1
-                max_consecutive = max(max_consecutive, current_consecutive)
-            else:
-                current_consecutive = 0
+        # A profitable day extends the streak only if it is the calendar day
+        # right after another profitable day
+        extends = np.concatenate((
+            [False],
+            profitable[:-1] & (np.diff(bet_days) == np.timedelta64(1, 'D')),
+        ))
+        streak_ids = np.cumsum(profitable & ~extends)[profitable]
         
-        return max_consecutive
+        return int(np.bincount(streak_ids).max(initial=0))
     
     def _empty_metrics(self) -> Dict:
         """Return empty metrics dictionary."""
@@ -1,10 +1,61 @@
 """Strategy analysis."""
-from typing import Dict, List
+from typing import Dict, List, Optional
+from sqlalchemy import and_, case, func, true
 from database.db import get_db
 from database.models import Bet
 from utils.helpers import calculate_roi
 
 
+_SETTLED_FILTER = (
+    Bet.confirmed == True,
+    Bet.status.in_(["won", "lost"]),
+)
+
+
+def _stats_columns(condition) -> tuple:
+    """Build the aggregates of the bets matching a condition.
+    
+    Args:
+        condition: SQLAlchemy boolean expression selecting the bets
+        
+    Returns:
+        Tuple of (count, won count, stake sum, profit sum) expressions, in
+        the argument order of StrategyAnalyzer._calculate_stats
+    """
+    return (
+        func.count(case((condition, 1))),
+        func.sum(case((and_(condition, Bet.status == "won"), 1), else_=0)),
+        func.sum(case((condition, Bet.stake))),
+        func.sum(case((condition, Bet.profit))),
+    )
+
+
+def _edge_range_columns(edge_ranges: List[tuple]) -> List:
+    """Build the aggregates of every edge range.
+    
+    One row of conditional aggregates, four per range, so ranges may
+    overlap and the bets are scanned once by the database.
+    
+    Args:
+        edge_ranges: List of (min, max) edge tuples
+    
+    Returns:
+        List of aggregate expressions, four per range in range order
+    """
+    return [
+        column
+        for low, high in edge_ranges
+        for column in _stats_columns(and_(Bet.edge >= low, Bet.edge < high))
+    ]
+
+
+# Favorites are odds < 2.0, underdogs are odds >= 2.0
+_FAVORITES_COLUMNS = (
+    *_stats_columns(Bet.odds < 2.0),
+    *_stats_columns(Bet.odds >= 2.0),
+)
+
+
 class StrategyAnalyzer:
     """Analyze different betting strategies."""
     
@@ -20,21 +71,13 @@ class StrategyAnalyzer:
         Returns:
             Dictionary with analysis for each edge range
         """
-        results = {}
+        if not edge_ranges:
+            return {}
         
         with get_db() as db:
-            bets = db.query(Bet).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"])
-            ).all()
-            
-            for low, high in edge_ranges:
-                range_bets = [b for b in bets if low <= b.edge < high]
-                
-                if range_bets:
-                    results[f"{low:.1%}-{high:.1%}"] = self._calculate_stats(range_bets)
+            row = db.query(*_edge_range_columns(edge_ranges)).filter(*_SETTLED_FILTER).one()
         
-        return results
+        return self._edge_range_results(edge_ranges, row)
     
     def analyze_by_market_type(self) -> Dict:
         """Analyze bets by market type.
@@ -42,21 +85,10 @@ class StrategyAnalyzer:
         Returns:
             Dictionary with analysis for each market type
         """
-        results = {}
-        
         with get_db() as db:
-            bets = db.query(Bet).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"])
-            ).all()
-            
-            market_types = set(b.market_type for b in bets)
-            
-            for market_type in market_types:
-                market_bets = [b for b in bets if b.market_type == market_type]
-                results[market_type] = self._calculate_stats(market_bets)
+            rows = self._market_type_query(db).all()
         
-        return results
+        return self._market_type_results(rows)
     
     def analyze_favorites_vs_underdogs(self) -> Dict:
         """Analyze performance on favorites vs underdogs.
@@ -65,45 +97,129 @@ class StrategyAnalyzer:
             Dictionary with comparison
         """
         with get_db() as db:
-            bets = db.query(Bet).filter(
-                Bet.confirmed == True,
-                Bet.status.in_(["won", "lost"])
-            ).all()
+            row = db.query(*_FAVORITES_COLUMNS).filter(*_SETTLED_FILTER).one()
+        
+        return self._favorites_results(row)
+    
+    def analyze_all(self, edge_ranges: List[tuple]) -> Dict:
+        """Run every strategy analysis in one session.
+        
+        The edge range and favorites/underdogs aggregates share one scan
+        of the settled bets, so a caller needing all three analyses makes
+        two queries instead of three sessions.
+        
+        Args:
+            edge_ranges: List of (min, max) edge tuples
             
-            # Favorites are odds < 2.0, underdogs are odds >= 2.0
-            favorites = [b for b in bets if b.odds < 2.0]
-            underdogs = [b for b in bets if b.odds >= 2.0]
+        Returns:
+            Dictionary with the results of analyze_by_edge_range,
+            analyze_by_market_type and analyze_favorites_vs_underdogs
+        """
+        edge_columns = _edge_range_columns(edge_ranges)
+        
+        with get_db() as db:
+            row = db.query(*edge_columns, *_FAVORITES_COLUMNS).filter(*_SETTLED_FILTER).one()
+            market_rows = self._market_type_query(db).all()
+        
+        return {
+            "by_edge_range": self._edge_range_results(edge_ranges, row[:len(edge_columns)]),
+            "by_market_type": self._market_type_results(market_rows),
+            "favorites_vs_underdogs": self._favorites_results(row[len(edge_columns):]),
+        }
+    
+    def _market_type_query(self, db):
+        """Build the query aggregating settled bets per market type.
+        
+        Args:
+            db: Database session
             
-            return {
-                "favorites": self._calculate_stats(favorites),
-                "underdogs": self._calculate_stats(underdogs),
-            }
+        Returns:
+            Query yielding (market_type, *aggregates) rows
+        """
+        return db.query(Bet.market_type, *_stats_columns(true())).filter(
+            *_SETTLED_FILTER
+        ).group_by(Bet.market_type)
+    
+    def _edge_range_results(self, edge_ranges: List[tuple], aggregates: tuple) -> Dict:
+        """Build the edge range analysis from its aggregates.
+        
+        Args:
+            edge_ranges: List of (min, max) edge tuples
+            aggregates: Values of the _edge_range_columns of edge_ranges
+            
+        Returns:
+            Dictionary with analysis for each non-empty edge range
+        """
+        results = {}
+        for i, (low, high) in enumerate(edge_ranges):
+            range_aggregates = aggregates[4 * i:4 * i + 4]
+            if range_aggregates[0]:
+                results[f"{low:.1%}-{high:.1%}"] = self._calculate_stats(*range_aggregates)
+        
+        return results
+    
+    def _market_type_results(self, rows: List[tuple]) -> Dict:
+        """Build the market type analysis from its aggregated rows.
+        
+        Args:
+            rows: (market_type, *aggregates) rows
+            
+        Returns:
+            Dictionary with analysis for each market type
+        """
+        return {
+            market_type: self._calculate_stats(*aggregates)
+            for market_type, *aggregates in rows
+        }
+    
+    def _favorites_results(self, aggregates: tuple) -> Dict:
+        """Build the favorites vs underdogs comparison from its aggregates.
+        
+        Args:
+            aggregates: Values of _FAVORITES_COLUMNS
+            
+        Returns:
+            Dictionary with comparison
+        """
+        return {
+            "favorites": self._calculate_stats(*aggregates[:4]),
+            "underdogs": self._calculate_stats(*aggregates[4:]),
+        }
     
-    def _calculate_stats(self, bets: List[Bet]) -> Dict:
-        """Calculate statistics for a list of bets.
+    def _calculate_stats(
+        self,
+        total_bets: int,
+        won_bets: Optional[int],
+        total_stake: Optional[float],
+        total_profit: Optional[float],
+    ) -> Dict:
+        """Calculate statistics from a group's SQL aggregates.
         
         Args:
-            bets: List of bets
+            total_bets: Number of bets
+            won_bets: Number of won bets
+            total_stake: Sum of stakes
+            total_profit: Sum of profits
             
         Returns:
             Statistics dictionary
         """
-        if not bets:
+        if not total_bets:
             return {
                 "total_bets": 0,
                 "win_rate": 0.0,
                 "roi": 0.0,
             }
         
-        total_stake = sum(b.stake for b in bets)
-        total_profit = sum(b.profit for b in bets)
-        won_bets = sum(1 for b in bets if b.status == "won")
+        won_bets = won_bets or 0
+        total_stake = total_stake or 0.0
+        total_profit = total_profit or 0.0
         
         return {
-            "total_bets": len(bets),
+            "total_bets": total_bets,
             "won_bets": won_bets,
-            "lost_bets": len(bets) - won_bets,
-            "win_rate": won_bets / len(bets),
+            "lost_bets": total_bets - won_bets,
+            "win_rate": won_bets / total_bets,
             "total_stake": total_stake,
             "total_profit": total_profit,
             "roi": calculate_roi(total_profit, total_stake),
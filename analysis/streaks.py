@@ -1,8 +1,9 @@
 """Streak tracking and analysis."""
 from typing import Dict, List
+import numpy as np
 from database.db import get_db
 from database.models import Bet
-from utils.helpers import get_streak_info
+from utils.helpers import get_streak_info, get_streak_info_from_runs, get_streak_runs
 
 
 class StreakAnalyzer:
@@ -18,18 +19,18 @@ class StreakAnalyzer:
             Current streak information
         """
         with get_db() as db:
-            recent_bets = db.query(Bet).filter(
+            recent_statuses = db.query(Bet.status).filter(
                 Bet.confirmed == True,
                 Bet.status.in_(["won", "lost"])
-            ).order_by(Bet.settled_at.desc()).limit(100).all()
-            
-            if not recent_bets:
-                return {"current_streak": 0, "type": None}
-            
-            results = [b.status == "won" for b in reversed(recent_bets)]
-            streak_info = get_streak_info(results)
-            
-            return streak_info
+            ).order_by(Bet.settled_at.desc(), Bet.id.desc()).limit(100).all()
+        
+        if not recent_statuses:
+            return {"current_streak": 0, "type": None}
+        
+        results = [status == "won" for status, in reversed(recent_statuses)]
+        streak_info = get_streak_info(results)
+        
+        return streak_info
     
     def get_streak_history(self) -> Dict:
         """Get historical streak information.
@@ -38,41 +39,28 @@ class StreakAnalyzer:
             Dictionary with streak history
         """
         with get_db() as db:
-            all_bets = db.query(Bet).filter(
+            statuses = db.query(Bet.status).filter(
                 Bet.confirmed == True,
                 Bet.status.in_(["won", "lost"])
-            ).order_by(Bet.settled_at).all()
-            
-            if not all_bets:
-                return {}
-            
-            results = [b.status == "won" for b in all_bets]
-            streak_info = get_streak_info(results)
-            
-            # Calculate average streak lengths
-            win_streaks = []
-            loss_streaks = []
-            current_streak = 0
-            current_type = None
-            
-            for result in results:
-                if current_type is None:
-                    current_type = result
-                    current_streak = 1
-                elif result == current_type:
-                    current_streak += 1
-                else:
-                    if current_type:
-                        win_streaks.append(current_streak)
-                    else:
-                        loss_streaks.append(current_streak)
-                    current_type = result
-                    current_streak = 1
-            
-            return {
-                **streak_info,
-                "avg_win_streak": sum(win_streaks) / len(win_streaks) if win_streaks else 0,
-                "avg_loss_streak": sum(loss_streaks) / len(loss_streaks) if loss_streaks else 0,
-                "total_win_streaks": len(win_streaks),
-                "total_loss_streaks": len(loss_streaks),
-            }
+            ).order_by(Bet.settled_at, Bet.id).all()
+        
+        if not statuses:
+            return {}
+        
+        won = np.fromiter(
+            (status == "won" for status, in statuses), dtype=bool, count=len(statuses)
+        )
+        
+        lengths, run_won = get_streak_runs(won)
+        
+        # The streak still running is left out of the averages and totals
+        win_streaks = lengths[:-1][run_won[:-1]]
+        loss_streaks = lengths[:-1][~run_won[:-1]]
+        
+        return {
+            **get_streak_info_from_runs(lengths, run_won),
+            "avg_win_streak": float(win_streaks.mean()) if win_streaks.size else 0,
+            "avg_loss_streak": float(loss_streaks.mean()) if loss_streaks.size else 0,
+            "total_win_streaks": int(win_streaks.size),
+            "total_loss_streaks": int(loss_streaks.size),
+        }
@@ -1,6 +1,7 @@
 """Timing analysis - odds movement over time."""
-from typing import Dict, List
+from typing import Dict, List, Optional
 from datetime import datetime, timedelta
+from sqlalchemy import func, or_
 from database.db import get_db
 from database.models import Odds, Match
 from config.constants import TIMING_WINDOWS
@@ -22,39 +23,60 @@ class TimingAnalyzer:
             Dictionary with odds movement analysis
         """
         with get_db() as db:
-            match = db.query(Match).filter(Match.id == match_id).first()
-            
-            if not match:
+            if db.query(Match.id).filter(Match.id == match_id).first() is None:
                 return {}
             
-            # Get all odds for this match ordered by time
-            odds_history = db.query(Odds).filter(
+            # Only the opening and closing snapshots and the number of
+            # updates are needed, not the whole odds history
+            total_updates = db.query(func.count(Odds.id)).filter(
                 Odds.match_id == match_id
-            ).order_by(Odds.timestamp).all()
+            ).scalar()
             
-            if not odds_history:
+            if not total_updates:
                 return {}
             
+            snapshot = db.query(Odds.team1_odds, Odds.team2_odds).filter(
+                Odds.match_id == match_id
+            )
+            opening = snapshot.order_by(Odds.timestamp, Odds.id).first()
+            closing = snapshot.order_by(Odds.timestamp.desc(), Odds.id.desc()).first()
+            
             # Analyze movement
-            opening = odds_history[0]
-            closing = odds_history[-1]
+            return self._build_movement(match_id, total_updates, opening, closing)
+    
+    def _build_movement(self, match_id: int, total_updates: int, opening, closing) -> Dict:
+        """Build the odds movement analysis of a match.
+        
+        Args:
+            match_id: Match ID
+            total_updates: Number of odds snapshots of the match
+            opening: Earliest odds snapshot (anything with team1_odds/team2_odds)
+            closing: Latest odds snapshot
             
-            return {
-                "match_id": match_id,
-                "total_updates": len(odds_history),
-                "opening_odds": {
-                    "team1": opening.team1_odds,
-                    "team2": opening.team2_odds,
-                },
-                "closing_odds": {
-                    "team1": closing.team1_odds,
-                    "team2": closing.team2_odds,
-                },
-                "movement": {
-                    "team1": closing.team1_odds - opening.team1_odds if opening.team1_odds and closing.team1_odds else 0,
-                    "team2": closing.team2_odds - opening.team2_odds if opening.team2_odds and closing.team2_odds else 0,
-                },
-            }
+        Returns:
+            Dictionary with odds movement analysis
+        """
+        return {
+            "match_id": match_id,
+            "total_updates": total_updates,
+            "opening_odds": {
+                "team1": opening.team1_odds,
+                "team2": opening.team2_odds,
+            },
+            "closing_odds": {
+                "team1": closing.team1_odds,
+                "team2": closing.team2_odds,
+            },
+            "movement": {
+                "team1": self._odds_change(opening.team1_odds, closing.team1_odds),
+                "team2": self._odds_change(opening.team2_odds, closing.team2_odds),
+            },
+        }
+    
+    @staticmethod
+    def _odds_change(opening: Optional[float], closing: Optional[float]) -> float:
+        """Change from opening to closing odds (0 if either is missing)."""
+        return closing - opening if opening and closing else 0
     
     def get_best_timing_window(self) -> Dict:
         """Find the best timing window for placing bets.
@@ -81,26 +103,81 @@ class TimingAnalyzer:
             List of steam moves
         """
         steam_moves = []
+        now = datetime.utcnow()
         
         with get_db() as db:
-            # Get recent matches
-            recent_matches = db.query(Match).filter(
-                Match.start_time > datetime.utcnow()
-            ).all()
+            rows = self._upcoming_odds_bounds_query(db, now).all()
+        
+        # Each match has its opening row (first_rank 1) and closing row
+        # (last_rank 1); a match with a single snapshot has one row for both
+        bounds = {}
+        for row in rows:
+            opening, closing = bounds.get(row.match_id, (None, None))
+            bounds[row.match_id] = (
+                row if row.first_rank == 1 else opening,
+                row if row.last_rank == 1 else closing,
+            )
+        
+        for match_id, (opening, closing) in bounds.items():
+            team1_change = self._odds_change(opening.team1_odds, closing.team1_odds)
+            team2_change = self._odds_change(opening.team2_odds, closing.team2_odds)
             
-            for match in recent_matches:
-                movement = self.analyze_odds_movement(match.id)
-                
-                if movement:
-                    team1_change = abs(movement["movement"]["team1"])
-                    team2_change = abs(movement["movement"]["team2"])
-                    
-                    if team1_change > threshold or team2_change > threshold:
-                        steam_moves.append({
-                            "match_id": match.id,
-                            "team1": match.team1,
-                            "team2": match.team2,
-                            **movement,
-                        })
+            # Only matches that moved get a result dict
+            if abs(team1_change) > threshold or abs(team2_change) > threshold:
+                steam_moves.append({
+                    "match_id": match_id,
+                    "team1": opening.team1,
+                    "team2": opening.team2,
+                    "total_updates": opening.total_updates,
+                    "opening_odds": {
+                        "team1": opening.team1_odds,
+                        "team2": opening.team2_odds,
+                    },
+                    "closing_odds": {
+                        "team1": closing.team1_odds,
+                        "team2": closing.team2_odds,
+                    },
+                    "movement": {
+                        "team1": team1_change,
+                        "team2": team2_change,
+                    },
+                })
         
         return steam_moves
+    
+    def _upcoming_odds_bounds_query(self, db, now: datetime):
+        """Build the query for the opening and closing odds of upcoming matches.
+        
+        Window functions rank every odds snapshot within its match, so all
+        upcoming matches are covered by one round trip instead of two
+        queries per match.
+        
+        Args:
+            db: Database session
+            now: Current UTC time; matches starting after it are upcoming
+            
+        Returns:
+            Query yielding the first and last snapshot rows of each upcoming
+            match, ordered by match ID
+        """
+        partition = Odds.match_id
+        ranked = db.query(
+            Odds.match_id,
+            Odds.team1_odds,
+            Odds.team2_odds,
+            Match.team1,
+            Match.team2,
+            func.row_number().over(
+                partition_by=partition, order_by=(Odds.timestamp, Odds.id)
+            ).label("first_rank"),
+            func.row_number().over(
+                partition_by=partition, order_by=(Odds.timestamp.desc(), Odds.id.desc())
+            ).label("last_rank"),
+            func.count().over(partition_by=partition).label("total_updates"),
+        ).join(Match, Odds.match_id == Match.id).filter(
+            Match.start_time > now
+        ).subquery()
+        
+        return db.query(ranked).filter(
+            or_(ranked.c.first_rank == 1, ranked.c.last_rank == 1)
+        ).order_by(ranked.c.match_id, ranked.c.first_rank)
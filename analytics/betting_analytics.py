@@ -3,13 +3,30 @@
 This module provides comprehensive analysis functions for NBA player props,
 soccer BTTS, esports map analysis, and more.
 """
-from typing import Dict, Optional, List
-from database.db import get_db_session
+import copy
+from functools import lru_cache
+from typing import Dict, Optional, List, Tuple
+from sqlalchemy import and_, case, func, literal, or_
+from database.db import get_db
 from database.historical_models import (
     NBAPlayerGameStats, NBAGame, NBATeamStats,
     SoccerMatch, SoccerTeamStats,
     EsportsMatch, EsportsTeamStats, EsportsMapStats
 )
+from utils.cache import TTLCache
+
+
+# Player prop analyses keyed by player, prop type, line and the version of
+# the player's game stats, which change at most once per game day
+_PROP_ANALYSIS_CACHE = TTLCache(default_ttl=3600, max_size=2048)
+
+# Game stats column behind each prop type of get_player_prop_analysis
+_PROP_COLUMNS = {
+    "points": NBAPlayerGameStats.points,
+    "rebounds": NBAPlayerGameStats.rebounds_total,
+    "assists": NBAPlayerGameStats.assists,
+    "pra": NBAPlayerGameStats.pts_reb_ast,
+}
 
 
 class BettingAnalytics:
@@ -17,7 +34,7 @@ class BettingAnalytics:
     
     def __init__(self):
         """Initialize analytics."""
-        self.db = get_db_session()
+        pass
     
     def get_player_prop_analysis(self, player_name: str, prop_type: str, line: float) -> Dict:
         """Get comprehensive NBA player prop analysis.
@@ -35,102 +52,128 @@ class BettingAnalytics:
             >>> props = analytics.get_player_prop_analysis("LeBron James", "points", 25.5)
             >>> print(f"Overall: {props['overall']['avg']} avg, {props['overall']['over_rate']}% over rate")
         """
-        # Query player game stats
-        stats = self.db.query(NBAPlayerGameStats).filter(
+        with get_db() as db:
+            # New or removed game stats change the version, so stale analyses
+            # are never served
+            version = db.query(
+                func.count(NBAPlayerGameStats.id),
+                func.max(NBAPlayerGameStats.created_at),
+            ).filter(
+                NBAPlayerGameStats.player_name == player_name
+            ).one()
+            
+            cache_key = f"{player_name}:{prop_type}:{line}:{tuple(version)}"
+            analysis = _PROP_ANALYSIS_CACHE.get(cache_key)
+            if analysis is None:
+                analysis = self._calculate_player_prop_analysis(db, player_name, prop_type, line)
+                _PROP_ANALYSIS_CACHE.set(cache_key, analysis)
+        
+        return copy.deepcopy(analysis)
+    
+    def _calculate_player_prop_analysis(self, db, player_name: str, prop_type: str, line: float) -> Dict:
+        """Calculate NBA player prop analysis from the player's game stats.
+        
+        Args:
+            db: Database session
+            player_name: Player name
+            prop_type: Type of prop
+            line: Prop line
+            
+        Returns:
+            Analysis dict with all splits
+        """
+        column = _PROP_COLUMNS.get(prop_type)
+        
+        # Every split is aggregated by the database in one round trip;
+        # games are ranked most recent first for the last 5/10 splits
+        ranked = db.query(
+            (func.coalesce(column, 0) if column is not None else literal(0)).label("value"),
+            case((NBAPlayerGameStats.is_home == True, 1), else_=0).label("home"),
+            func.row_number().over(
+                order_by=(NBAPlayerGameStats.created_at.desc(), NBAPlayerGameStats.id)
+            ).label("rank"),
+        ).filter(
             NBAPlayerGameStats.player_name == player_name
-        ).all()
+        ).subquery()
         
-        if not stats:
-            return {"error": "Player not found"}
+        value, home, rank = ranked.c.value, ranked.c.home, ranked.c.rank
+        over = case((value > line, 1), else_=0)
         
-        # Get the stat values based on prop_type
-        values = []
-        for stat in stats:
-            if prop_type == "points":
-                values.append(stat.points or 0)
-            elif prop_type == "rebounds":
-                values.append(stat.rebounds_total or 0)
-            elif prop_type == "assists":
-                values.append(stat.assists or 0)
-            elif prop_type == "pra":
-                values.append(stat.pts_reb_ast or 0)
+        def split(condition) -> tuple:
+            return (
+                func.sum(case((condition, value), else_=0)),
+                func.sum(case((condition, over), else_=0)),
+                func.sum(case((condition, 1), else_=0)),
+            )
         
-        if not values:
-            return {"error": "No stats found"}
+        row = db.query(
+            func.sum(value), func.sum(over), func.count(),
+            *split(home == 1),
+            *split(home == 0),
+            *split(rank <= 5),
+            *split(rank <= 10),
+            func.max(case((rank == 1, value))),
+        ).one()
         
-        # Calculate overall stats
-        over_count = sum(1 for v in values if v > line)
-        under_count = len(values) - over_count
-        avg = sum(values) / len(values) if values else 0
-        over_rate = (over_count / len(values) * 100) if values else 0
+        if not row[2]:
+            return {"error": "Player not found"}
         
-        # Home/Away splits
-        home_values = [
-            self._get_stat_value(stat, prop_type) 
-            for stat in stats if stat.is_home
-        ]
-        away_values = [
-            self._get_stat_value(stat, prop_type) 
-            for stat in stats if not stat.is_home
-        ]
+        if column is None:
+            return {"error": "No stats found"}
         
-        # Last 5 and 10 games
-        recent_stats = sorted(stats, key=lambda x: x.created_at, reverse=True)
-        last_5_values = [self._get_stat_value(stat, prop_type) for stat in recent_stats[:5]]
-        last_10_values = [self._get_stat_value(stat, prop_type) for stat in recent_stats[:10]]
+        games, home_games, away_games = int(row[2]), int(row[5]), int(row[8])
+        latest_value = float(row[15])
+        
+        avg, over_rate = self._prop_split(*row[0:3])
+        home_avg, home_over_rate = self._prop_split(*row[3:6])
+        away_avg, away_over_rate = self._prop_split(*row[6:9])
+        last_5_avg, last_5_over_rate = self._prop_split(*row[9:12])
+        last_10_avg, last_10_over_rate = self._prop_split(*row[12:15])
         
         analysis = {
             "overall": {
                 "avg": round(avg, 1),
                 "over_rate": round(over_rate, 1),
-                "games": len(values)
+                "games": games
             },
             "home": {
-                "avg": round(sum(home_values) / len(home_values), 1) if home_values else 0,
-                "over_rate": round(sum(1 for v in home_values if v > line) / len(home_values) * 100, 1) if home_values else 0,
-                "games": len(home_values)
+                "avg": round(home_avg, 1),
+                "over_rate": round(home_over_rate, 1),
+                "games": home_games
             },
             "away": {
-                "avg": round(sum(away_values) / len(away_values), 1) if away_values else 0,
-                "over_rate": round(sum(1 for v in away_values if v > line) / len(away_values) * 100, 1) if away_values else 0,
-                "games": len(away_values)
+                "avg": round(away_avg, 1),
+                "over_rate": round(away_over_rate, 1),
+                "games": away_games
             },
             "last_5": {
-                "avg": round(sum(last_5_values) / len(last_5_values), 1) if last_5_values else 0,
-                "over_rate": round(sum(1 for v in last_5_values if v > line) / len(last_5_values) * 100, 1) if last_5_values else 0,
-                "trend": "UP" if last_5_values and last_5_values[0] > avg else "DOWN"
+                "avg": round(last_5_avg, 1),
+                "over_rate": round(last_5_over_rate, 1),
+                "trend": "UP" if latest_value > avg else "DOWN"
             },
             "last_10": {
-                "avg": round(sum(last_10_values) / len(last_10_values), 1) if last_10_values else 0,
-                "over_rate": round(sum(1 for v in last_10_values if v > line) / len(last_10_values) * 100, 1) if last_10_values else 0,
+                "avg": round(last_10_avg, 1),
+                "over_rate": round(last_10_over_rate, 1),
             }
         }
         
         return analysis
     
-    def _get_stat_value(self, stat: NBAPlayerGameStats, prop_type: str) -> int:
-        """Get stat value based on prop type.
+    def _prop_split(self, value_sum: float, over_count: int, games: int) -> Tuple[float, float]:
+        """Average and over rate of a split of a player's games.
         
         Args:
-            stat: Player game stat
-            prop_type: Type of prop
+            value_sum: Sum of the prop's values over the split
+            over_count: Number of games over the line
+            games: Number of games in the split
             
         Returns:
-            Stat value
+            Tuple of (average, over rate in percent); both 0 for an empty split
         """
-        if prop_type == "points":
-            return stat.points or 0
-        elif prop_type == "rebounds":
-            return stat.rebounds_total or 0
-        elif prop_type == "assists":
-            return stat.assists or 0
-        elif prop_type == "pra":
-            return stat.pts_reb_ast or 0
-        elif prop_type == "steals":
-            return stat.steals or 0
-        elif prop_type == "blocks":
-            return stat.blocks or 0
-        return 0
+        if not games:
+            return 0, 0
+        # SUM may come back as Decimal (e.g. PostgreSQL), so convert first
+        return float(value_sum) / int(games), int(over_count) / int(games) * 100
     
     def get_team_btts_analysis(self, team_name: str, league: str) -> Dict:
         """Get soccer team Both Teams To Score analysis.
@@ -147,31 +190,36 @@ class BettingAnalytics:
             >>> btts = analytics.get_team_btts_analysis("Liverpool", "eng.1")
             >>> print(f"BTTS Rate: {btts['overall']['rate']}%")
         """
-        # Get team stats
-        team_stat = self.db.query(SoccerTeamStats).filter(
-            SoccerTeamStats.team == team_name,
-            SoccerTeamStats.league == league
-        ).first()
-        
-        if not team_stat:
-            return {"error": "Team not found"}
-        
-        # Get matches
-        home_matches = self.db.query(SoccerMatch).filter(
-            SoccerMatch.home_team == team_name,
-            SoccerMatch.league == league
-        ).all()
-        
-        away_matches = self.db.query(SoccerMatch).filter(
-            SoccerMatch.away_team == team_name,
-            SoccerMatch.league == league
-        ).all()
+        with get_db() as db:
+            # Get team stats
+            team_stat = db.query(SoccerTeamStats.btts_percentage).filter(
+                SoccerTeamStats.team == team_name,
+                SoccerTeamStats.league == league
+            ).first()
+            
+            if team_stat is None:
+                return {"error": "Team not found"}
+            
+            # Home and away games and BTTS counts in one aggregate query
+            is_home = SoccerMatch.home_team == team_name
+            is_away = SoccerMatch.away_team == team_name
+            btts = SoccerMatch.btts == True
+            
+            home_games, home_btts, away_games, away_btts = (
+                int(count or 0) for count in db.query(
+                    func.sum(case((is_home, 1), else_=0)),
+                    func.sum(case((and_(is_home, btts), 1), else_=0)),
+                    func.sum(case((is_away, 1), else_=0)),
+                    func.sum(case((and_(is_away, btts), 1), else_=0)),
+                ).filter(
+                    or_(is_home, is_away),
+                    SoccerMatch.league == league
+                ).one()
+            )
         
         # Calculate BTTS rates
-        home_btts = sum(1 for m in home_matches if m.btts)
-        away_btts = sum(1 for m in away_matches if m.btts)
         total_btts = home_btts + away_btts
-        total_games = len(home_matches) + len(away_matches)
+        total_games = home_games + away_games
         
         analysis = {
             "overall": {
@@ -179,12 +227,12 @@ class BettingAnalytics:
                 "games": total_games
             },
             "home": {
-                "rate": round((home_btts / len(home_matches) * 100) if home_matches else 0, 1),
-                "games": len(home_matches)
+                "rate": round((home_btts / home_games * 100) if home_games else 0, 1),
+                "games": home_games
             },
             "away": {
-                "rate": round((away_btts / len(away_matches) * 100) if away_matches else 0, 1),
-                "games": len(away_matches)
+                "rate": round((away_btts / away_games * 100) if away_games else 0, 1),
+                "games": away_games
             },
             "trend": "UP" if team_stat.btts_percentage and team_stat.btts_percentage > 55 else "STABLE"
         }
@@ -206,45 +254,36 @@ class BettingAnalytics:
             >>> maps = analytics.get_team_map_stats("Sentinels", "valorant")
             >>> print(f"Ascent: {maps['ascent']['win_rate']}% win rate")
         """
-        # Get matches for this team
-        matches = self.db.query(EsportsMatch).filter(
+        plays_match = and_(
             EsportsMatch.game == game,
             (EsportsMatch.team1 == team_name) | (EsportsMatch.team2 == team_name)
-        ).all()
+        )
         
-        if not matches:
-            return {"error": "Team not found"}
-        
-        # Get map stats
-        map_data = {}
-        
-        for match in matches:
-            map_stats = self.db.query(EsportsMapStats).filter(
-                EsportsMapStats.match_id == match.match_id
+        # Played/won counts per map across the team's matches in one join,
+        # maps listed in order of first appearance
+        with get_db() as db:
+            map_name = func.lower(EsportsMapStats.map_name)
+            rows = db.query(
+                map_name,
+                func.count(EsportsMapStats.id),
+                func.sum(case((EsportsMapStats.winner == team_name, 1), else_=0)),
+            ).join(
+                EsportsMatch, EsportsMapStats.match_id == EsportsMatch.match_id
+            ).filter(plays_match).group_by(map_name).order_by(
+                func.min(EsportsMatch.id), func.min(EsportsMapStats.id)
             ).all()
             
-            for map_stat in map_stats:
-                map_name = map_stat.map_name.lower()
-                
-                if map_name not in map_data:
-                    map_data[map_name] = {
-                        "played": 0,
-                        "won": 0
-                    }
-                
-                map_data[map_name]["played"] += 1
-                
-                # Check if team won this map
-                if map_stat.winner == team_name:
-                    map_data[map_name]["won"] += 1
+            if not rows and db.query(EsportsMatch.id).filter(plays_match).first() is None:
+                return {"error": "Team not found"}
         
         # Calculate win rates
         result = {}
-        for map_name, data in map_data.items():
-            result[map_name] = {
-                "played": data["played"],
-                "won": data["won"],
-                "win_rate": round((data["won"] / data["played"] * 100) if data["played"] > 0 else 0, 1)
+        for name, played, won in rows:
+            won = int(won)
+            result[name] = {
+                "played": played,
+                "won": won,
+                "win_rate": round((won / played * 100) if played > 0 else 0, 1)
             }
         
         return result
@@ -261,11 +300,20 @@ class BettingAnalytics:
         """
         from database.historical_models import ValueBetHistory
         
-        value_bets = self.db.query(ValueBetHistory).filter(
-            ValueBetHistory.sport == sport,
-            ValueBetHistory.edge >= min_edge,
-            ValueBetHistory.result == "PENDING"
-        ).all()
+        with get_db() as db:
+            value_bets = db.query(
+                ValueBetHistory.match_description,
+                ValueBetHistory.selection,
+                ValueBetHistory.our_probability,
+                ValueBetHistory.implied_probability,
+                ValueBetHistory.edge,
+                ValueBetHistory.odds,
+                ValueBetHistory.confidence_score,
+            ).filter(
+                ValueBetHistory.sport == sport,
+                ValueBetHistory.edge >= min_edge,
+                ValueBetHistory.result == "PENDING"
+            ).all()
         
         return [
             {
@@ -281,13 +329,17 @@ class BettingAnalytics:
         ]
     
     def close(self):
-        """Close database connection."""
-        self.db.close()
+        """Kept for compatibility; every method closes its own session."""
+        pass
 
 
 # Convenience function
+@lru_cache(maxsize=1)
 def get_analytics() -> BettingAnalytics:
-    """Get BettingAnalytics instance.
+    """Get the shared BettingAnalytics instance.
+    
+    The instance holds no session (each method opens its own), so one
+    instance is safely shared by every caller.
     
     Returns:
         BettingAnalytics instance
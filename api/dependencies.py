@@ -1,7 +1,31 @@
 """Database dependencies for FastAPI."""
 from typing import Generator
-from sqlalchemy.orm import Session
-from database.db import SessionLocal
+from sqlalchemy import event
+from sqlalchemy.orm import ORMExecuteState, Session, raiseload, sessionmaker
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from analytics.betting_analytics import BettingAnalytics, get_analytics
+from database.db import engine
+
+# Sessions handed to routes. Relationships they do not load explicitly
+# raise instead of lazy loading, so an N+1 query inside a response loop
+# fails loudly rather than issuing one SELECT per row.
+RouteSession = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(RouteSession, "do_orm_execute")
+def _raise_on_lazy_load(orm_execute_state: ORMExecuteState):
+    """Add raiseload('*') to every top-level ORM SELECT of a route session.
+    
+    lambda_stmt statements are left alone: adding options rebuilds them
+    from the cached statement, freezing the parameters of its first use.
+    """
+    if (
+        orm_execute_state.is_select
+        and not isinstance(orm_execute_state.statement, StatementLambdaElement)
+        and not orm_execute_state.is_column_load
+        and not orm_execute_state.is_relationship_load
+    ):
+        orm_execute_state.statement = orm_execute_state.statement.options(raiseload("*"))
 
 
 def get_db() -> Generator[Session, None, None]:
@@ -11,8 +35,18 @@ def get_db() -> Generator[Session, None, None]:
     Yields:
         Database session
     """
-    db = SessionLocal()
+    db = RouteSession()
     try:
         yield db
     finally:
         db.close()
+
+
+def get_betting_analytics() -> BettingAnalytics:
+    """
+    Dependency function to get the shared betting analytics.
+    
+    Returns:
+        BettingAnalytics instance shared by all requests
+    """
+    return get_analytics()
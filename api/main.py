@@ -1,14 +1,20 @@
 """FastAPI main application."""
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.middleware.gzip import GZipMiddleware
+from api.responses import DefaultResponse
 from api.routes import games, players, props, health, stats, value_bets, validation
 
 app = FastAPI(
     title="Capivara Bet API",
     description="API for Capivara Bet Esports betting system",
-    version="1.0.0"
+    version="1.0.0",
+    default_response_class=DefaultResponse,
 )
 
+# Compress larger payloads (analytics responses repeat many keys)
+app.add_middleware(GZipMiddleware, minimum_size=1024)
+
 # CORS middleware for frontend
 app.add_middleware(
     CORSMiddleware,
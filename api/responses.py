@@ -0,0 +1,60 @@
+"""Response classes shared by the API."""
+import dataclasses
+import json
+from datetime import date, datetime
+from typing import Any, Iterable, Iterator
+from fastapi.responses import JSONResponse
+
+# Serialize responses with orjson when it is installed
+try:
+    import orjson
+    from fastapi.responses import ORJSONResponse as DefaultResponse
+    
+    def dumps(content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return orjson.dumps(content)
+except ImportError:
+    def _default(obj: Any) -> Any:
+        """Encode the types orjson handles natively (dataclasses, datetimes)."""
+        if dataclasses.is_dataclass(obj):
+            return dataclasses.asdict(obj)
+        if isinstance(obj, (date, datetime)):
+            return obj.isoformat()
+        raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+    
+    def dumps(content: Any) -> bytes:
+        """Serialize content to JSON bytes."""
+        return json.dumps(
+            content,
+            ensure_ascii=False,
+            allow_nan=False,
+            separators=(",", ":"),
+            default=_default
+        ).encode("utf-8")
+    
+    class DefaultResponse(JSONResponse):
+        """JSONResponse rendering dataclasses and datetimes like ORJSONResponse."""
+        
+        def render(self, content: Any) -> bytes:
+            return dumps(content)
+
+
+def iter_json_array(items: Iterable[Any]) -> Iterator[bytes]:
+    """
+    Serialize items as a JSON array, one chunk per item.
+    
+    Used with StreamingResponse so large lists are sent while they are
+    read instead of being built and serialized as a whole.
+    
+    Args:
+        items: JSON-ready items
+        
+    Yields:
+        Chunks of the JSON array
+    """
+    separator = b"["
+    for item in items:
+        yield separator + dumps(item)
+        separator = b","
+    
+    yield b"[]" if separator == b"[" else b"]"
@@ -1,18 +1,143 @@
 """Game routes."""
-from fastapi import APIRouter, Depends, Query
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import and_, or_
+from sqlalchemy import lambda_stmt, or_, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from dataclasses import dataclass, field
 from typing import List, Optional
-from datetime import datetime, timedelta
+from datetime import date as date_type, datetime, timedelta
 from api.dependencies import get_db
+from api.responses import DefaultResponse
 from api.schemas.game import GameResponse, GameWithOdds, OddsSchema
 from database.models import Match, Odds
 
 router = APIRouter()
 
 
-@router.get("/games", response_model=List[GameWithOdds])
-async def get_games(
+# Columns of a game payload; odds come from an outer join, one row per odds
+_GAME_COLUMNS = (
+    Match.game,
+    Match.team1,
+    Match.team2,
+    Match.start_time,
+    Match.tournament,
+    Match.best_of,
+    Match.id,
+    Match.winner,
+    Match.team1_score,
+    Match.team2_score,
+    Match.finished,
+)
+_ODDS_COLUMNS = (
+    Odds.bookmaker,
+    Odds.team1_odds,
+    Odds.team2_odds,
+    Odds.timestamp,
+)
+
+
+@dataclass(slots=True)
+class _OddsPayload:
+    """Odds entry of a game payload (fields in OddsSchema order)."""
+    bookmaker: str
+    team1_odds: Optional[float]
+    team2_odds: Optional[float]
+    timestamp: Optional[datetime]
+
+
+@dataclass(slots=True)
+class _GamePayload:
+    """Game payload, serialized directly by the response class.
+    
+    Fields follow GameWithOdds order; building these is cheaper than a
+    dict per game and orjson encodes them natively.
+    """
+    game: str
+    team1: str
+    team2: str
+    start_time: datetime
+    tournament: Optional[str]
+    best_of: Optional[int]
+    id: int
+    winner: Optional[str]
+    team1_score: Optional[int]
+    team2_score: Optional[int]
+    finished: Optional[bool]
+    is_live: bool
+    odds: List[_OddsPayload] = field(default_factory=list)
+
+
+def _games_stmt() -> StatementLambdaElement:
+    """
+    Start a cached select of game payload rows.
+    
+    The statement is a lambda_stmt, so SQLAlchemy compiles it once and
+    reuses the SQL on every request; callers extend it with
+    ``stmt += lambda s: s.where(...)``, keeping any Python conditionals
+    outside the lambdas so each filter combination caches separately.
+    
+    Returns:
+        Lambda statement over the game and odds columns
+    """
+    return lambda_stmt(
+        lambda: select(*_GAME_COLUMNS, *_ODDS_COLUMNS).select_from(Match).outerjoin(
+            Odds,
+            Odds.match_id == Match.id
+        ).order_by(Match.start_time, Match.id, Odds.id)
+    )
+
+
+def _fetch_games(db: Session, current_time: datetime, stmt: StatementLambdaElement) -> List[_GamePayload]:
+    """
+    Fetch games with their odds as GameWithOdds payloads.
+    
+    Matches and odds are read as plain columns in one outer-join query
+    and grouped by match here, so no ORM objects are built. The payloads
+    are rendered as is by the response class, without a response_model
+    validation pass.
+    
+    Args:
+        db: Database session
+        current_time: Current time, deciding which games are live
+        stmt: Statement from _games_stmt with the filters applied
+        
+    Returns:
+        List of game payloads ordered by start time
+    """
+    games = []
+    game = None
+    for row in db.execute(stmt):
+        if game is None or game.id != row.id:
+            game = _GamePayload(
+                row.game,
+                row.team1,
+                row.team2,
+                row.start_time,
+                row.tournament,
+                row.best_of,
+                row.id,
+                row.winner,
+                row.team1_score,
+                row.team2_score,
+                row.finished,
+                not row.finished and row.start_time <= current_time
+            )
+            games.append(game)
+        
+        # Matches without odds come back once, with NULL odds columns
+        if row.bookmaker is not None:
+            game.odds.append(_OddsPayload(
+                row.bookmaker,
+                row.team1_odds,
+                row.team2_odds,
+                row.timestamp
+            ))
+    
+    return games
+
+
+@router.get("/games", response_model=None, responses={200: {"model": List[GameWithOdds]}})
+def get_games(
     date: Optional[str] = Query(None, description="Date in YYYY-MM-DD format"),
     league: Optional[str] = Query(None, description="League/tournament name"),
     game: Optional[str] = Query(None, description="Game type (cs2, lol, dota2, valorant, nba, etc)"),
@@ -30,73 +155,42 @@ async def get_games(
     Returns:
         List of games with odds
     """
-    query = db.query(Match)
+    current_time = datetime.utcnow()
     
     # Date filter
+    target_date = current_time.date()
     if date:
         try:
-            target_date = datetime.strptime(date, "%Y-%m-%d").date()
+            target_date = date_type.fromisoformat(date)
         except ValueError:
-            target_date = datetime.utcnow().date()
-    else:
-        target_date = datetime.utcnow().date()
+            pass
     
     # Filter by date range (whole day)
     start_of_day = datetime.combine(target_date, datetime.min.time())
     end_of_day = datetime.combine(target_date, datetime.max.time())
     
-    query = query.filter(
-        and_(
-            Match.start_time >= start_of_day,
-            Match.start_time <= end_of_day
-        )
+    stmt = _games_stmt()
+    stmt += lambda s: s.where(
+        Match.start_time >= start_of_day,
+        Match.start_time <= end_of_day
     )
     
-    # League filter
+    # League filter (the pattern is built outside the lambda so it is
+    # bound as a parameter)
     if league:
-        query = query.filter(Match.tournament.ilike(f"%{league}%"))
+        pattern = f"%{league}%"
+        stmt += lambda s: s.where(Match.tournament.ilike(pattern))
     
     # Game filter
     if game:
-        query = query.filter(Match.game == game)
-    
-    matches = query.order_by(Match.start_time).all()
+        stmt += lambda s: s.where(Match.game == game)
     
     # Add is_live field based on current time
-    current_time = datetime.utcnow()
-    result = []
-    
-    for match in matches:
-        match_dict = {
-            "id": match.id,
-            "game": match.game,
-            "team1": match.team1,
-            "team2": match.team2,
-            "start_time": match.start_time,
-            "tournament": match.tournament,
-            "best_of": match.best_of,
-            "winner": match.winner,
-            "team1_score": match.team1_score,
-            "team2_score": match.team2_score,
-            "finished": match.finished,
-            "is_live": not match.finished and match.start_time <= current_time,
-            "odds": [
-                {
-                    "bookmaker": odd.bookmaker,
-                    "team1_odds": odd.team1_odds,
-                    "team2_odds": odd.team2_odds,
-                    "timestamp": odd.timestamp
-                }
-                for odd in match.odds
-            ]
-        }
-        result.append(match_dict)
-    
-    return result
-
-
-@router.get("/games/live", response_model=List[GameWithOdds])
-async def get_live_games(
+    return DefaultResponse(_fetch_games(db, current_time, stmt))
+
+
+@router.get("/games/live", response_model=None, responses={200: {"model": List[GameWithOdds]}})
+def get_live_games(
     game: Optional[str] = Query(None, description="Game type filter"),
     db: Session = Depends(get_db)
 ):
@@ -113,50 +207,20 @@ async def get_live_games(
     current_time = datetime.utcnow()
     
     # Games that started but haven't finished
-    query = db.query(Match).filter(
-        and_(
-            Match.start_time <= current_time,
-            Match.finished.is_(False)
-        )
+    stmt = _games_stmt()
+    stmt += lambda s: s.where(
+        Match.start_time <= current_time,
+        Match.finished.is_(False)
     )
     
     if game:
-        query = query.filter(Match.game == game)
-    
-    matches = query.order_by(Match.start_time).all()
-    
-    result = []
-    for match in matches:
-        match_dict = {
-            "id": match.id,
-            "game": match.game,
-            "team1": match.team1,
-            "team2": match.team2,
-            "start_time": match.start_time,
-            "tournament": match.tournament,
-            "best_of": match.best_of,
-            "winner": match.winner,
-            "team1_score": match.team1_score,
-            "team2_score": match.team2_score,
-            "finished": match.finished,
-            "is_live": True,
-            "odds": [
-                {
-                    "bookmaker": odd.bookmaker,
-                    "team1_odds": odd.team1_odds,
-                    "team2_odds": odd.team2_odds,
-                    "timestamp": odd.timestamp
-                }
-                for odd in match.odds
-            ]
-        }
-        result.append(match_dict)
-    
-    return result
-
-
-@router.get("/games/{game_id}", response_model=GameWithOdds)
-async def get_game_by_id(
+        stmt += lambda s: s.where(Match.game == game)
+    
+    return DefaultResponse(_fetch_games(db, current_time, stmt))
+
+
+@router.get("/games/{game_id}", response_model=None, responses={200: {"model": GameWithOdds}})
+def get_game_by_id(
     game_id: int,
     db: Session = Depends(get_db)
 ):
@@ -170,33 +234,12 @@ async def get_game_by_id(
     Returns:
         Game details with odds
     """
-    match = db.query(Match).filter(Match.id == game_id).first()
+    stmt = _games_stmt()
+    stmt += lambda s: s.where(Match.id == game_id)
     
-    if not match:
-        return {"error": "Game not found"}
+    games = _fetch_games(db, datetime.utcnow(), stmt)
     
-    current_time = datetime.utcnow()
+    if not games:
+        raise HTTPException(status_code=404, detail="Game not found")
     
-    return {
-        "id": match.id,
-        "game": match.game,
-        "team1": match.team1,
-        "team2": match.team2,
-        "start_time": match.start_time,
-        "tournament": match.tournament,
-        "best_of": match.best_of,
-        "winner": match.winner,
-        "team1_score": match.team1_score,
-        "team2_score": match.team2_score,
-        "finished": match.finished,
-        "is_live": not match.finished and match.start_time <= current_time,
-        "odds": [
-            {
-                "bookmaker": odd.bookmaker,
-                "team1_odds": odd.team1_odds,
-                "team2_odds": odd.team2_odds,
-                "timestamp": odd.timestamp
-            }
-            for odd in match.odds
-        ]
-    }
+    return DefaultResponse(games[0])
@@ -1,5 +1,6 @@
 """Health check routes."""
 from fastapi import APIRouter, Depends
+from fastapi.responses import JSONResponse
 from sqlalchemy.orm import Session
 from sqlalchemy import text
 from api.dependencies import get_db
@@ -9,11 +10,28 @@ router = APIRouter()
 
 
 @router.get("/health")
-async def health_check(db: Session = Depends(get_db)):
+def health_check():
     """
-    Health check endpoint.
+    Liveness endpoint.
     
-    Returns system status and database connectivity.
+    Returns as soon as the process can serve requests, without touching
+    the database, so frequent liveness probes add no database traffic.
+    Pooled connections are validated on checkout by pool_pre_ping.
+    """
+    return {
+        "status": "ok",
+        "timestamp": datetime.utcnow().isoformat(),
+        "version": "1.0.0"
+    }
+
+
+@router.get("/ready")
+def readiness_check(db: Session = Depends(get_db)):
+    """
+    Readiness endpoint.
+    
+    Returns system status and database connectivity, with a 503 status
+    while the database is unreachable.
     """
     try:
         # Test database connection
@@ -22,9 +40,13 @@ async def health_check(db: Session = Depends(get_db)):
     except Exception as e:
         db_status = f"error: {str(e)}"
     
-    return {
+    content = {
         "status": "ok" if db_status == "ok" else "degraded",
         "timestamp": datetime.utcnow().isoformat(),
         "database": db_status,
         "version": "1.0.0"
     }
+    
+    if db_status != "ok":
+        return JSONResponse(status_code=503, content=content)
+    return content
@@ -1,6 +1,7 @@
 """Player routes."""
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.orm import Session
+from sqlalchemy import case
 from typing import List, Optional
 from api.dependencies import get_db
 from api.schemas.player import PlayerBase, PlayerGameLog
@@ -10,7 +11,7 @@ router = APIRouter()
 
 
 @router.get("/players/search")
-async def search_players(
+def search_players(
     q: str = Query(..., description="Search query (player name)"),
     sport: Optional[str] = Query("nba", description="Sport type"),
     db: Session = Depends(get_db)
@@ -50,7 +51,7 @@ async def search_players(
 
 
 @router.get("/players/{player_id}/gamelog")
-async def get_player_gamelog(
+def get_player_gamelog(
     player_id: str,
     limit: int = Query(10, description="Number of games to return"),
     db: Session = Depends(get_db)
@@ -66,8 +67,22 @@ async def get_player_gamelog(
     Returns:
         List of recent games
     """
-    # Get player's recent games
-    games = db.query(NBAPlayerGameStats, NBAGame).join(
+    # Get player's recent games (plain column rows, no ORM objects)
+    games = db.query(
+        NBAGame.game_id,
+        NBAGame.game_date,
+        case(
+            (NBAPlayerGameStats.is_home == True, NBAGame.away_team),
+            else_=NBAGame.home_team
+        ).label("opponent"),
+        NBAPlayerGameStats.is_home,
+        NBAPlayerGameStats.minutes,
+        NBAPlayerGameStats.points,
+        NBAPlayerGameStats.rebounds_total,
+        NBAPlayerGameStats.assists,
+        NBAPlayerGameStats.steals,
+        NBAPlayerGameStats.blocks
+    ).join(
         NBAGame,
         NBAPlayerGameStats.game_id == NBAGame.game_id
     ).filter(
@@ -77,20 +92,18 @@ async def get_player_gamelog(
     ).limit(limit).all()
     
     result = []
-    for stat, game in games:
-        opponent = game.away_team if stat.is_home else game.home_team
-        
+    for row in games:
         result.append({
-            "game_id": game.game_id,
-            "game_date": game.game_date.isoformat() if game.game_date else None,
-            "opponent": opponent,
-            "is_home": stat.is_home,
-            "minutes": stat.minutes,
-            "points": stat.points,
-            "rebounds_total": stat.rebounds_total,
-            "assists": stat.assists,
-            "steals": stat.steals,
-            "blocks": stat.blocks
+            "game_id": row.game_id,
+            "game_date": row.game_date.isoformat() if row.game_date else None,
+            "opponent": row.opponent,
+            "is_home": row.is_home,
+            "minutes": row.minutes,
+            "points": row.points,
+            "rebounds_total": row.rebounds_total,
+            "assists": row.assists,
+            "steals": row.steals,
+            "blocks": row.blocks
         })
     
     return result
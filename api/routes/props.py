@@ -1,7 +1,8 @@
 """Player props routes."""
-from fastapi import APIRouter, Depends, Query
+import math
+from fastapi import APIRouter, Depends, HTTPException, Query
 from sqlalchemy.orm import Session
-from sqlalchemy import func
+from sqlalchemy import case, func
 from typing import List, Optional
 from api.dependencies import get_db
 from api.schemas.player import PlayerPropsResponse, PlayerPropAnalysis, PlayerGameLog
@@ -9,9 +10,69 @@ from database.historical_models import NBAPlayerGameStats, NBAGame
 
 router = APIRouter()
 
+# Prop type -> stat column analyzed for it
+_PROP_STATS = (
+    ("points", NBAPlayerGameStats.points),
+    ("rebounds", NBAPlayerGameStats.rebounds_total),
+    ("assists", NBAPlayerGameStats.assists),
+)
+
+
+def _prop_analysis(
+    prop_type: str,
+    average: Optional[float],
+    games: int,
+    over_floor: int,
+    over_ceil: int,
+    last_5_avg: Optional[float],
+    last_10_avg: Optional[float]
+) -> Optional[dict]:
+    """
+    Build one prop's analysis from its SQL aggregates.
+    
+    Args:
+        prop_type: Prop type name
+        average: Average of the stat (None if the player has no values)
+        games: Number of games with a value for the stat
+        over_floor: Number of games above average - 0.5
+        over_ceil: Number of games above average + 0.5
+        last_5_avg: Average over the 5 most recent games with a value
+        last_10_avg: Average over the 10 most recent games with a value
+        
+    Returns:
+        Prop analysis dict, or None if the stat has no values
+    """
+    if average is None:
+        return None
+    
+    # Postgres AVG returns Decimal
+    average = float(average)
+    line = round(average - 0.5, 1)  # Typical line slightly below average
+    
+    # Stats are integers, so a game is over the line exactly when it is
+    # over the line's integer part; that is average - 0.5 rounded down,
+    # unless rounding to one decimal carried the line up to the next integer
+    if math.floor(line) > math.floor(average - 0.5):
+        over_count = over_ceil
+    else:
+        over_count = over_floor
+    over_rate = (over_count / games) * 100
+    
+    return {
+        "prop_type": prop_type,
+        "line": line,
+        "average": round(average, 1),
+        "over_rate": round(over_rate, 1),
+        "under_rate": round(100 - over_rate, 1),
+        "last_5_avg": round(float(last_5_avg), 1),
+        "last_10_avg": round(float(last_10_avg), 1),
+        "home_avg": None,
+        "away_avg": None
+    }
+
 
 @router.get("/props/{player_id}")
-async def get_player_props(
+def get_player_props(
     player_id: str,
     db: Session = Depends(get_db)
 ):
@@ -35,19 +96,45 @@ async def get_player_props(
     ).first()
     
     if not player_info:
-        return {"error": "Player not found"}
+        raise HTTPException(status_code=404, detail="Player not found")
     
-    # Get all player stats for analysis
-    all_stats = db.query(NBAPlayerGameStats, NBAGame).join(
+    # Rank each stat's values most recent first (games missing the stat
+    # rank last) alongside the stat's average over all games
+    ranked_columns = []
+    for prop_type, column in _PROP_STATS:
+        ranked_columns += [
+            column.label(prop_type),
+            func.row_number().over(
+                order_by=(column.is_(None), NBAGame.game_date.desc())
+            ).label(f"{prop_type}_rank"),
+            func.avg(column).over().label(f"{prop_type}_avg"),
+        ]
+    
+    ranked = db.query(*ranked_columns).join(
         NBAGame,
         NBAPlayerGameStats.game_id == NBAGame.game_id
     ).filter(
         NBAPlayerGameStats.player_id == player_id
-    ).order_by(
-        NBAGame.game_date.desc()
-    ).all()
+    ).subquery()
+    
+    # Averages and over counts of every prop in one aggregate row
+    aggregates = [func.count()]
+    for prop_type, _ in _PROP_STATS:
+        value = ranked.c[prop_type]
+        rank = ranked.c[f"{prop_type}_rank"]
+        average = ranked.c[f"{prop_type}_avg"]
+        aggregates += [
+            func.avg(value),
+            func.count(value),
+            func.count(case((value > average - 0.5, 1))),
+            func.count(case((value > average + 0.5, 1))),
+            func.avg(case((rank <= 5, value))),
+            func.avg(case((rank <= 10, value))),
+        ]
     
-    if not all_stats:
+    totals = db.query(*aggregates).one()
+    
+    if not totals[0]:
         return {
             "player_id": player_id,
             "player_name": player_info.player_name if player_info else "Unknown",
@@ -58,92 +145,48 @@ async def get_player_props(
     
     # Calculate averages and rates
     props_analysis = []
+    for i, (prop_type, _) in enumerate(_PROP_STATS):
+        analysis = _prop_analysis(prop_type, *totals[1 + 6 * i:7 + 6 * i])
+        if analysis:
+            props_analysis.append(analysis)
     
-    # Points prop
-    points = [stat.points for stat, game in all_stats if stat.points is not None]
-    if points:
-        avg_points = sum(points) / len(points)
-        last_5_points = sum(points[:5]) / min(5, len(points))
-        last_10_points = sum(points[:10]) / min(10, len(points))
-        
-        # Calculate over rate for a typical line (using average)
-        line = round(avg_points - 0.5, 1)  # Typical line slightly below average
-        over_count = sum(1 for p in points if p > line)
-        over_rate = (over_count / len(points)) * 100
-        
-        props_analysis.append({
-            "prop_type": "points",
-            "line": line,
-            "average": round(avg_points, 1),
-            "over_rate": round(over_rate, 1),
-            "under_rate": round(100 - over_rate, 1),
-            "last_5_avg": round(last_5_points, 1),
-            "last_10_avg": round(last_10_points, 1),
-            "home_avg": None,
-            "away_avg": None
-        })
-    
-    # Rebounds prop
-    rebounds = [stat.rebounds_total for stat, game in all_stats if stat.rebounds_total is not None]
-    if rebounds:
-        avg_reb = sum(rebounds) / len(rebounds)
-        last_5_reb = sum(rebounds[:5]) / min(5, len(rebounds))
-        last_10_reb = sum(rebounds[:10]) / min(10, len(rebounds))
-        
-        line = round(avg_reb - 0.5, 1)
-        over_count = sum(1 for r in rebounds if r > line)
-        over_rate = (over_count / len(rebounds)) * 100
-        
-        props_analysis.append({
-            "prop_type": "rebounds",
-            "line": line,
-            "average": round(avg_reb, 1),
-            "over_rate": round(over_rate, 1),
-            "under_rate": round(100 - over_rate, 1),
-            "last_5_avg": round(last_5_reb, 1),
-            "last_10_avg": round(last_10_reb, 1),
-            "home_avg": None,
-            "away_avg": None
-        })
-    
-    # Assists prop
-    assists = [stat.assists for stat, game in all_stats if stat.assists is not None]
-    if assists:
-        avg_ast = sum(assists) / len(assists)
-        last_5_ast = sum(assists[:5]) / min(5, len(assists))
-        last_10_ast = sum(assists[:10]) / min(10, len(assists))
-        
-        line = round(avg_ast - 0.5, 1)
-        over_count = sum(1 for a in assists if a > line)
-        over_rate = (over_count / len(assists)) * 100
-        
-        props_analysis.append({
-            "prop_type": "assists",
-            "line": line,
-            "average": round(avg_ast, 1),
-            "over_rate": round(over_rate, 1),
-            "under_rate": round(100 - over_rate, 1),
-            "last_5_avg": round(last_5_ast, 1),
-            "last_10_avg": round(last_10_ast, 1),
-            "home_avg": None,
-            "away_avg": None
-        })
+    # Recent games (plain column rows, no ORM objects)
+    recent_stats = db.query(
+        NBAGame.game_id,
+        NBAGame.game_date,
+        case(
+            (NBAPlayerGameStats.is_home == True, NBAGame.away_team),
+            else_=NBAGame.home_team
+        ).label("opponent"),
+        NBAPlayerGameStats.is_home,
+        NBAPlayerGameStats.minutes,
+        NBAPlayerGameStats.points,
+        NBAPlayerGameStats.rebounds_total,
+        NBAPlayerGameStats.assists,
+        NBAPlayerGameStats.steals,
+        NBAPlayerGameStats.blocks
+    ).join(
+        NBAGame,
+        NBAPlayerGameStats.game_id == NBAGame.game_id
+    ).filter(
+        NBAPlayerGameStats.player_id == player_id
+    ).order_by(
+        NBAGame.game_date.desc()
+    ).limit(10).all()
     
-    # Recent games
     recent_games = []
-    for stat, game in all_stats[:10]:
-        opponent = game.away_team if stat.is_home else game.home_team
+    for row in recent_stats:
         recent_games.append({
-            "game_id": game.game_id,
-            "game_date": game.game_date.isoformat() if game.game_date else None,
-            "opponent": opponent,
-            "is_home": stat.is_home,
-            "minutes": stat.minutes,
-            "points": stat.points,
-            "rebounds_total": stat.rebounds_total,
-            "assists": stat.assists,
-            "steals": stat.steals,
-            "blocks": stat.blocks
+            "game_id": row.game_id,
+            "game_date": row.game_date.isoformat() if row.game_date else None,
+            "opponent": row.opponent,
+            "is_home": row.is_home,
+            "minutes": row.minutes,
+            "points": row.points,
+            "rebounds_total": row.rebounds_total,
+            "assists": row.assists,
+            "steals": row.steals,
+            "blocks": row.blocks
         })
     
     return {
@@ -1,55 +1,76 @@
 """Stats routes for dashboard."""
 from fastapi import APIRouter, Depends, Query, HTTPException
-from sqlalchemy.orm import Session
-from sqlalchemy import func, desc
-from typing import List, Optional, Dict, Any
+from fastapi.responses import Response, StreamingResponse
+from sqlalchemy.orm import Session, contains_eager, load_only
+from sqlalchemy import case, desc, func, lambda_stmt, literal, select
+from sqlalchemy.sql.lambdas import StatementLambdaElement
+from typing import Any, Dict, Iterator, List, Optional
 from datetime import datetime, timedelta
-from api.dependencies import get_db
+from api.dependencies import RouteSession, get_db
+from api.responses import iter_json_array
 from database.historical_models import EsportsMatch, EsportsPlayerStats
+from utils.cache import TTLCache
 
 router = APIRouter()
 
+# Dashboard aggregates keyed by endpoint and query params; matches are
+# ingested every few minutes, so polling clients share one computation
+_STATS_CACHE = TTLCache(default_ttl=60, max_size=128)
+
+# TTL (seconds) of the slow-moving summaries (overview, tournaments)
+_SUMMARY_TTL = 300
+
+# Rows fetched per round trip when streaming results
+_STREAM_BATCH_SIZE = 1000
+
+# Largest recent-results limit whose response body is cached; larger
+# bodies are only streamed, never held in memory as a whole
+_CACHED_RESULTS_LIMIT = _STREAM_BATCH_SIZE
+
 
 @router.get("/stats/overview")
-async def get_overview(db: Session = Depends(get_db)) -> Dict[str, Any]:
+def get_overview(db: Session = Depends(get_db)) -> Dict[str, Any]:
     """
     Get overview statistics.
     
     Returns:
         Overview stats including total matches and breakdown by game
     """
-    # Total matches
-    total_matches = db.query(func.count(EsportsMatch.id)).scalar() or 0
-    
-    # Total finished matches
-    finished_matches = db.query(func.count(EsportsMatch.id)).filter(
-        EsportsMatch.winner.isnot(None)
-    ).scalar() or 0
+    cached = _STATS_CACHE.get("overview")
+    if cached is not None:
+        return cached
     
-    # Breakdown by game
-    game_breakdown = db.query(
+    # Total, finished and recent (last 7 days) matches per game, in the
+    # shape of a per-game summary table; the totals are summed from it
+    seven_days_ago = datetime.utcnow() - timedelta(days=7)
+    game_summary = db.query(
         EsportsMatch.game,
-        func.count(EsportsMatch.id).label('count')
+        func.count(EsportsMatch.id),
+        func.count(case((EsportsMatch.winner.isnot(None), EsportsMatch.id))),
+        func.count(case((EsportsMatch.match_date >= seven_days_ago, EsportsMatch.id)))
     ).group_by(EsportsMatch.game).all()
     
-    breakdown = {game: count for game, count in game_breakdown}
+    total_matches = finished_matches = recent_count = 0
+    breakdown = {}
+    for game, count, finished, recent in game_summary:
+        breakdown[game] = count
+        total_matches += count
+        finished_matches += finished
+        recent_count += recent
     
-    # Recent matches count (last 7 days)
-    seven_days_ago = datetime.utcnow() - timedelta(days=7)
-    recent_count = db.query(func.count(EsportsMatch.id)).filter(
-        EsportsMatch.match_date >= seven_days_ago
-    ).scalar() or 0
-    
-    return {
+    overview = {
         "total_matches": total_matches,
         "finished_matches": finished_matches,
         "recent_matches": recent_count,
         "breakdown_by_game": breakdown
     }
+    
+    _STATS_CACHE.set("overview", overview, ttl=_SUMMARY_TTL)
+    return overview
 
 
 @router.get("/stats/teams")
-async def get_team_stats(
+def get_team_stats(
     game: Optional[str] = Query(None, description="Filter by game type"),
     limit: int = Query(20, description="Number of teams to return"),
     db: Session = Depends(get_db)
@@ -64,108 +85,168 @@ async def get_team_stats(
     Returns:
         List of teams with their statistics
     """
-    # Build query to get all matches
-    query = db.query(EsportsMatch).filter(EsportsMatch.winner.isnot(None))
-    
-    if game:
-        query = query.filter(EsportsMatch.game == game)
-    
-    matches = query.all()
-    
-    # Calculate team stats
-    team_stats = {}
-    
-    for match in matches:
-        # Process team1
-        if match.team1 not in team_stats:
-            team_stats[match.team1] = {
-                "team": match.team1,
-                "game": match.game,
-                "matches_played": 0,
-                "wins": 0,
-                "losses": 0,
-                "win_rate": 0.0
-            }
-        
-        team_stats[match.team1]["matches_played"] += 1
-        if match.winner == match.team1:
-            team_stats[match.team1]["wins"] += 1
-        else:
-            team_stats[match.team1]["losses"] += 1
+    cache_key = f"teams:{game}:{limit}"
+    cached = _STATS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # One row per (team, finished match) appearance; side orders the two
+    # teams of a match so teams keep the order they first appear in
+    def appearances(side: int, team):
+        query = db.query(
+            team.label('team'),
+            EsportsMatch.id.label('match_id'),
+            literal(side).label('side'),
+            case((EsportsMatch.winner == team, 1), else_=0).label('win')
+        ).filter(EsportsMatch.winner.isnot(None))
         
-        # Process team2
-        if match.team2 not in team_stats:
-            team_stats[match.team2] = {
-                "team": match.team2,
-                "game": match.game,
-                "matches_played": 0,
-                "wins": 0,
-                "losses": 0,
-                "win_rate": 0.0
-            }
+        if game:
+            query = query.filter(EsportsMatch.game == game)
         
-        team_stats[match.team2]["matches_played"] += 1
-        if match.winner == match.team2:
-            team_stats[match.team2]["wins"] += 1
-        else:
-            team_stats[match.team2]["losses"] += 1
+        return query
+    
+    team_matches = appearances(0, EsportsMatch.team1).union_all(
+        appearances(1, EsportsMatch.team2)
+    ).subquery()
+    
+    # Count matches and wins per team with at least 3 matches
+    team_totals = db.query(
+        team_matches.c.team,
+        func.count().label('matches_played'),
+        func.sum(team_matches.c.win).label('wins'),
+        func.min(team_matches.c.match_id).label('first_match'),
+        func.min(team_matches.c.match_id * 2 + team_matches.c.side).label('first_seen')
+    ).group_by(team_matches.c.team).having(func.count() >= 3).subquery()
+    
+    # A team's game is the game of its first match
+    teams = db.query(
+        team_totals.c.team,
+        EsportsMatch.game,
+        team_totals.c.matches_played,
+        team_totals.c.wins
+    ).join(
+        EsportsMatch,
+        EsportsMatch.id == team_totals.c.first_match
+    ).order_by(team_totals.c.first_seen).all()
     
-    # Calculate win rates and filter teams with at least 3 matches
+    # Calculate win rates
     result = []
-    for team, stats in team_stats.items():
-        if stats["matches_played"] >= 3:
-            stats["win_rate"] = round(stats["wins"] / stats["matches_played"] * 100, 2)
-            result.append(stats)
+    for team, game_name, matches_played, wins in teams:
+        wins = int(wins)
+        result.append({
+            "team": team,
+            "game": game_name,
+            "matches_played": matches_played,
+            "wins": wins,
+            "losses": matches_played - wins,
+            "win_rate": round(wins / matches_played * 100, 2)
+        })
     
-    # Sort by win rate and then by matches played
+    # Rank on the rounded win rate that is returned, then by matches
+    # played; the sort is stable, so remaining ties keep the order teams
+    # first appear in
     result.sort(key=lambda x: (x["win_rate"], x["matches_played"]), reverse=True)
     
-    return result[:limit]
+    result = result[:limit]
+    _STATS_CACHE.set(cache_key, result)
+    return result
 
 
 @router.get("/stats/recent-results")
-async def get_recent_results(
+def get_recent_results(
     limit: int = Query(10, description="Number of results to return"),
-    game: Optional[str] = Query(None, description="Filter by game type"),
-    db: Session = Depends(get_db)
-) -> List[Dict[str, Any]]:
+    game: Optional[str] = Query(None, description="Filter by game type")
+) -> Response:
     """
     Get recent match results.
     
+    The results are streamed as a JSON array while they are fetched, so
+    large limits are never held in memory as a whole. Bodies of limits up
+    to _CACHED_RESULTS_LIMIT are cached once streamed.
+    
     Args:
         limit: Number of results to return
         game: Filter by game type
         
     Returns:
-        List of recent matches
+        Streamed (or cached) list of recent matches
     """
-    query = db.query(EsportsMatch).filter(EsportsMatch.winner.isnot(None))
+    cache_key = f"recent-results:{game}:{limit}"
+    cached = _STATS_CACHE.get(cache_key)
+    if cached is not None:
+        return Response(content=cached, media_type="application/json")
+    
+    # Compiled once and reused; conditionals stay outside the lambdas
+    query = lambda_stmt(lambda: select(
+        EsportsMatch.id,
+        EsportsMatch.game,
+        EsportsMatch.tournament,
+        EsportsMatch.match_date,
+        EsportsMatch.team1,
+        EsportsMatch.team2,
+        EsportsMatch.team1_score,
+        EsportsMatch.team2_score,
+        EsportsMatch.winner,
+        EsportsMatch.best_of
+    ).where(EsportsMatch.winner.isnot(None)))
     
     if game:
-        query = query.filter(EsportsMatch.game == game)
+        query += lambda s: s.where(EsportsMatch.game == game)
     
-    matches = query.order_by(desc(EsportsMatch.match_date)).limit(limit).all()
+    query += lambda s: s.order_by(desc(EsportsMatch.match_date)).limit(limit)
     
-    result = []
-    for match in matches:
-        result.append({
-            "id": match.id,
-            "game": match.game,
-            "tournament": match.tournament,
-            "match_date": match.match_date.isoformat() if match.match_date else None,
-            "team1": match.team1,
-            "team2": match.team2,
-            "team1_score": match.team1_score,
-            "team2_score": match.team2_score,
-            "winner": match.winner,
-            "best_of": match.best_of
-        })
+    chunks = iter_json_array(_iter_recent_results(query))
+    if limit <= _CACHED_RESULTS_LIMIT:
+        chunks = _cache_chunks(cache_key, chunks)
     
-    return result
+    return StreamingResponse(chunks, media_type="application/json")
+
+
+def _cache_chunks(cache_key: str, chunks: Iterator[bytes]) -> Iterator[bytes]:
+    """
+    Pass chunks through, caching the whole body once they are all sent.
+    
+    Args:
+        cache_key: Stats cache key of the body
+        chunks: Response body chunks
+        
+    Yields:
+        The chunks, unchanged
+    """
+    body = []
+    for chunk in chunks:
+        body.append(chunk)
+        yield chunk
+    
+    _STATS_CACHE.set(cache_key, b"".join(body))
+
+
+def _iter_recent_results(query: StatementLambdaElement) -> Iterator[Dict[str, Any]]:
+    """
+    Fetch recent results in batches.
+    
+    The session is opened here rather than through Depends(get_db):
+    dependency cleanup runs before a streamed body is sent.
+    
+    Args:
+        query: Lambda statement selecting the result columns
+        
+    Yields:
+        Recent match dictionaries
+    """
+    db = RouteSession()
+    try:
+        result = db.execute(query, execution_options={"yield_per": _STREAM_BATCH_SIZE})
+        # Rows map the selected columns in response order; the serializer
+        # renders match_date as an ISO string
+        for match in result.mappings():
+            yield dict(match)
+    finally:
+        db.close()
 
 
 @router.get("/stats/tournaments")
-async def get_tournaments(
+def get_tournaments(
     game: Optional[str] = Query(None, description="Filter by game type"),
     db: Session = Depends(get_db)
 ) -> List[Dict[str, Any]]:
@@ -178,6 +259,11 @@ async def get_tournaments(
     Returns:
         List of tournaments with match counts
     """
+    cache_key = f"tournaments:{game}"
+    cached = _STATS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
     query = db.query(
         EsportsMatch.tournament,
         EsportsMatch.game,
@@ -199,11 +285,12 @@ async def get_tournaments(
             "latest_match": latest_match.isoformat() if latest_match else None
         })
     
+    _STATS_CACHE.set(cache_key, result, ttl=_SUMMARY_TTL)
     return result
 
 
 @router.get("/teams")
-async def get_teams(
+def get_teams(
     game: Optional[str] = Query(None, description="Filter by game type (valorant, cs2, lol, dota2, nba)"),
     db: Session = Depends(get_db)
 ) -> List[Dict[str, Any]]:
@@ -219,36 +306,42 @@ async def get_teams(
     if not game:
         raise HTTPException(status_code=400, detail="Game parameter is required")
     
-    # Get unique teams for the specified game
-    teams_query = db.query(
-        EsportsMatch.team1.label('team'),
-        EsportsMatch.game
-    ).filter(EsportsMatch.game == game).union(
-        db.query(
-            EsportsMatch.team2.label('team'),
-            EsportsMatch.game
+    cache_key = f"team-list:{game}"
+    cached = _STATS_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    # One row per (team, match) appearance of the game's matches
+    def appearances(team):
+        return db.query(
+            team.label('team'),
+            EsportsMatch.id.label('match_id'),
+            case((EsportsMatch.winner == team, EsportsMatch.id)).label('won_match_id')
         ).filter(EsportsMatch.game == game)
-    )
     
-    teams = teams_query.distinct().all()
+    team_matches = appearances(EsportsMatch.team1).union_all(
+        appearances(EsportsMatch.team2)
+    ).subquery()
+    
+    # Count matches and wins of every team in one grouped query (distinct,
+    # so a match listing the same team on both sides counts once), sorted
+    # by matches played and win rate
+    matches_count = func.count(team_matches.c.match_id.distinct())
+    wins_count = func.count(team_matches.c.won_match_id.distinct())
+    
+    teams = db.query(
+        team_matches.c.team,
+        matches_count,
+        wins_count
+    ).group_by(team_matches.c.team).order_by(
+        matches_count.desc(),
+        (wins_count * 1.0 / matches_count).desc(),
+        team_matches.c.team
+    ).all()
     
     # Calculate basic stats for each team
     result = []
-    for team_row in teams:
-        team_name = team_row.team
-        
-        # Count matches
-        matches_count = db.query(func.count(EsportsMatch.id)).filter(
-            EsportsMatch.game == game,
-            ((EsportsMatch.team1 == team_name) | (EsportsMatch.team2 == team_name))
-        ).scalar() or 0
-        
-        # Count wins
-        wins_count = db.query(func.count(EsportsMatch.id)).filter(
-            EsportsMatch.game == game,
-            EsportsMatch.winner == team_name
-        ).scalar() or 0
-        
+    for team_name, matches_count, wins_count in teams:
         win_rate = (wins_count / matches_count * 100) if matches_count > 0 else 0
         
         result.append({
@@ -259,14 +352,12 @@ async def get_teams(
             "win_rate": round(win_rate, 1)
         })
     
-    # Sort by matches played and win rate
-    result.sort(key=lambda x: (x["matches_played"], x["win_rate"]), reverse=True)
-    
+    _STATS_CACHE.set(cache_key, result)
     return result
 
 
 @router.get("/teams/{team_name}/players")
-async def get_team_players(
+def get_team_players(
     team_name: str,
     game: Optional[str] = Query(None, description="Filter by game type"),
     db: Session = Depends(get_db)
@@ -281,44 +372,35 @@ async def get_team_players(
     Returns:
         List of players from the team
     """
-    # Query distinct players from the team
-    query = db.query(
+    # Players of the team with their match counts and stat averages
+    players = db.query(
         EsportsPlayerStats.player_id,
         EsportsPlayerStats.player_name,
         EsportsPlayerStats.team,
-        func.count(EsportsPlayerStats.id).label('matches_played')
+        func.count(EsportsPlayerStats.id).label('matches_played'),
+        func.avg(EsportsPlayerStats.kills).label('avg_kills'),
+        func.avg(EsportsPlayerStats.deaths).label('avg_deaths'),
+        func.avg(EsportsPlayerStats.assists).label('avg_assists'),
+        func.avg(EsportsPlayerStats.kd_ratio).label('avg_kd')
     ).filter(
         EsportsPlayerStats.team == team_name
     ).group_by(
         EsportsPlayerStats.player_id,
         EsportsPlayerStats.player_name,
         EsportsPlayerStats.team
-    )
-    
-    players = query.all()
+    ).all()
     
     result = []
     for player in players:
-        # Get player stats averages
-        stats = db.query(
-            func.avg(EsportsPlayerStats.kills).label('avg_kills'),
-            func.avg(EsportsPlayerStats.deaths).label('avg_deaths'),
-            func.avg(EsportsPlayerStats.assists).label('avg_assists'),
-            func.avg(EsportsPlayerStats.kd_ratio).label('avg_kd')
-        ).filter(
-            EsportsPlayerStats.player_id == player.player_id,
-            EsportsPlayerStats.team == team_name
-        ).first()
-        
         result.append({
             "player_id": player.player_id,
             "player_name": player.player_name,
             "team": player.team,
             "matches_played": player.matches_played,
-            "avg_kills": round(stats.avg_kills, 1) if stats.avg_kills else 0,
-            "avg_deaths": round(stats.avg_deaths, 1) if stats.avg_deaths else 0,
-            "avg_assists": round(stats.avg_assists, 1) if stats.avg_assists else 0,
-            "avg_kd": round(stats.avg_kd, 2) if stats.avg_kd else 0
+            "avg_kills": round(player.avg_kills, 1) if player.avg_kills else 0,
+            "avg_deaths": round(player.avg_deaths, 1) if player.avg_deaths else 0,
+            "avg_assists": round(player.avg_assists, 1) if player.avg_assists else 0,
+            "avg_kd": round(player.avg_kd, 2) if player.avg_kd else 0
         })
     
     # Sort by matches played
@@ -328,7 +410,7 @@ async def get_team_players(
 
 
 @router.get("/players/{player_id}/stats")
-async def get_player_stats(
+def get_player_stats(
     player_id: str,
     limit: int = Query(20, description="Number of recent matches to return"),
     db: Session = Depends(get_db)
@@ -355,54 +437,77 @@ async def get_player_stats(
     if not player_info:
         raise HTTPException(status_code=404, detail="Player not found")
     
-    # Get all player stats with match info
-    player_stats = db.query(
-        EsportsPlayerStats,
-        EsportsMatch
+    # The player's most recent matches; the id tie-break keeps the same
+    # matches in the averages and in the recent match list
+    recent_stats = db.query(
+        EsportsPlayerStats.id
     ).join(
         EsportsMatch,
         EsportsPlayerStats.match_id == EsportsMatch.match_id
     ).filter(
         EsportsPlayerStats.player_id == player_id
     ).order_by(
-        desc(EsportsMatch.match_date)
-    ).limit(limit).all()
+        desc(EsportsMatch.match_date),
+        EsportsPlayerStats.id
+    ).limit(limit).subquery()
+    
+    # Averages over the recent matches; missing core stats count as 0 and
+    # game-specific stats average over the matches reporting them
+    totals = db.query(
+        func.count(),
+        func.avg(func.coalesce(EsportsPlayerStats.kills, 0)),
+        func.avg(func.coalesce(EsportsPlayerStats.deaths, 0)),
+        func.avg(func.coalesce(EsportsPlayerStats.assists, 0)),
+        func.avg(func.coalesce(EsportsPlayerStats.kd_ratio, 0)),
+        func.avg(case((EsportsPlayerStats.adr != 0, EsportsPlayerStats.adr))),
+        func.avg(case((EsportsPlayerStats.acs != 0, EsportsPlayerStats.acs)))
+    ).join(
+        recent_stats,
+        recent_stats.c.id == EsportsPlayerStats.id
+    ).one()
     
-    # Calculate averages
-    if player_stats:
-        stats_list = [stat for stat, _ in player_stats]
-        
-        total_matches = len(stats_list)
-        avg_kills = sum(s.kills or 0 for s in stats_list) / total_matches
-        avg_deaths = sum(s.deaths or 0 for s in stats_list) / total_matches
-        avg_assists = sum(s.assists or 0 for s in stats_list) / total_matches
-        avg_kd = sum(s.kd_ratio or 0 for s in stats_list) / total_matches
-        
-        # Game-specific averages
-        avg_adr = sum(s.adr or 0 for s in stats_list if s.adr) / len([s for s in stats_list if s.adr]) if any(s.adr for s in stats_list) else None
-        avg_acs = sum(s.acs or 0 for s in stats_list if s.acs) / len([s for s in stats_list if s.acs]) if any(s.acs for s in stats_list) else None
-        
-        averages = {
-            "kills": round(avg_kills, 1),
-            "deaths": round(avg_deaths, 1),
-            "assists": round(avg_assists, 1),
-            "kd_ratio": round(avg_kd, 2),
-            "adr": round(avg_adr, 1) if avg_adr else None,
-            "acs": round(avg_acs, 1) if avg_acs else None
-        }
-    else:
-        averages = {
-            "kills": 0,
-            "deaths": 0,
-            "assists": 0,
-            "kd_ratio": 0,
-            "adr": None,
-            "acs": None
-        }
+    total_matches, avg_kills, avg_deaths, avg_assists, avg_kd, avg_adr, avg_acs = totals
+    
+    # Recent matches, with each stat's match populated from the join
+    # (other relationships raise instead of lazy loading). Only the
+    # columns formatted below are selected from either table
+    player_stats = db.query(
+        EsportsPlayerStats
+    ).join(
+        EsportsPlayerStats.match
+    ).options(
+        load_only(
+            EsportsPlayerStats.team,
+            EsportsPlayerStats.kills,
+            EsportsPlayerStats.deaths,
+            EsportsPlayerStats.assists,
+            EsportsPlayerStats.kd_ratio,
+            EsportsPlayerStats.adr,
+            EsportsPlayerStats.acs,
+            EsportsPlayerStats.rating,
+            EsportsPlayerStats.agent,
+            EsportsPlayerStats.champion,
+            EsportsPlayerStats.hero
+        ),
+        contains_eager(EsportsPlayerStats.match).load_only(
+            EsportsMatch.match_id,
+            EsportsMatch.match_date,
+            EsportsMatch.tournament,
+            EsportsMatch.team1,
+            EsportsMatch.team2,
+            EsportsMatch.winner
+        )
+    ).filter(
+        EsportsPlayerStats.player_id == player_id
+    ).order_by(
+        desc(EsportsMatch.match_date),
+        EsportsPlayerStats.id
+    ).limit(limit).all()
     
     # Format recent matches
     recent_matches = []
-    for stat, match in player_stats:
+    for stat in player_stats:
+        match = stat.match
         opponent = match.team2 if match.team1 == stat.team else match.team1
         
         recent_matches.append({
@@ -423,11 +528,31 @@ async def get_player_stats(
             "hero": stat.hero
         })
     
+    # Round averages (Postgres AVG returns Decimal)
+    if total_matches:
+        averages = {
+            "kills": round(float(avg_kills), 1),
+            "deaths": round(float(avg_deaths), 1),
+            "assists": round(float(avg_assists), 1),
+            "kd_ratio": round(float(avg_kd), 2),
+            "adr": round(float(avg_adr), 1) if avg_adr else None,
+            "acs": round(float(avg_acs), 1) if avg_acs else None
+        }
+    else:
+        averages = {
+            "kills": 0,
+            "deaths": 0,
+            "assists": 0,
+            "kd_ratio": 0,
+            "adr": None,
+            "acs": None
+        }
+    
     return {
         "player_id": player_info.player_id,
         "player_name": player_info.player_name,
         "team": player_info.team,
-        "total_matches": len(player_stats),
+        "total_matches": total_matches,
         "averages": averages,
         "recent_matches": recent_matches
     }
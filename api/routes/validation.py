@@ -1,6 +1,7 @@
 """Validation routes for paper trading dashboard."""
+from functools import lru_cache
 from fastapi import APIRouter, Query
-from datetime import datetime, timedelta
+from datetime import date, datetime, timedelta
 from api.schemas.validation import (
     ValidationMetrics,
     PeriodInfo,
@@ -28,8 +29,26 @@ async def get_validation_metrics(
     Returns:
         Validation metrics including performance by sport, market, and overall stats
     """
+    return _build_validation_metrics(days, datetime.utcnow().date())
+
+
+@lru_cache(maxsize=32)
+def _build_validation_metrics(days: int, today: date) -> ValidationMetrics:
+    """
+    Build the validation metrics of a period.
+    
+    Memoized: the metrics only depend on the period, and passing today's
+    date makes the cached entries roll over daily.
+    
+    Args:
+        days: Number of days to analyze
+        today: Last day of the period
+        
+    Returns:
+        Validation metrics of the period
+    """
     # Calculate period
-    end_date = datetime.utcnow()
+    end_date = today
     start_date = end_date - timedelta(days=days)
     
     # Mock data for demonstration
@@ -1,8 +1,10 @@
 """Bet analyzer - analyze betting performance."""
+from bisect import bisect_left
+from collections import defaultdict
 from typing import Dict, List, Optional
 from datetime import datetime, timedelta
 from database.db import get_db
-from database.models import Bet
+from database.models import Bet, Match
 from sqlalchemy import func
 from utils.helpers import calculate_roi
 
@@ -58,21 +60,23 @@ class BetAnalyzer:
         Returns:
             Dictionary of {game: stats}
         """
-        stats_by_game = {}
+        bets_by_game = defaultdict(list)
         
         with get_db() as db:
-            bets = db.query(Bet).join(Bet.match).filter(
+            # The game comes with each row, so no match is lazy-loaded per bet
+            rows = db.query(Bet, Match.game).join(Bet.match).filter(
                 Bet.confirmed == True,
                 Bet.status.in_(["won", "lost"])
             ).all()
             
-            games = set(b.match.game for b in bets if b.match)
+            # Dispatch each bet to its game in a single pass
+            for bet, game in rows:
+                bets_by_game[game].append(bet)
             
-            for game in games:
-                game_bets = [b for b in bets if b.match and b.match.game == game]
-                stats_by_game[game] = self._calculate_stats(game_bets)
-        
-        return stats_by_game
+            return {
+                game: self._calculate_stats(game_bets)
+                for game, game_bets in bets_by_game.items()
+            }
     
     def get_stats_by_confidence(self, ranges: List[tuple]) -> Dict:
         """Get statistics by confidence range.
@@ -91,9 +95,17 @@ class BetAnalyzer:
                 Bet.status.in_(["won", "lost"])
             ).all()
             
+            # Sort once by confidence; each range is then a contiguous slice
+            # found by bisection (ranges may overlap)
+            order = sorted(range(len(bets)), key=lambda i: bets[i].confidence)
+            confidences = [bets[i].confidence for i in order]
+            
             for low, high in ranges:
-                range_bets = [b for b in bets if low <= b.confidence < high]
-                if range_bets:
+                start = bisect_left(confidences, low)
+                end = bisect_left(confidences, high, lo=start)
+                if end > start:
+                    # Restore query order so sums match a plain filter
+                    range_bets = [bets[i] for i in sorted(order[start:end])]
                     stats[f"{low:.0%}-{high:.0%}"] = self._calculate_stats(range_bets)
         
         return stats
@@ -104,7 +116,7 @@ class BetAnalyzer:
         Returns:
             Dictionary of {bookmaker: stats}
         """
-        stats_by_bookmaker = {}
+        bets_by_bookmaker = defaultdict(list)
         
         with get_db() as db:
             bets = db.query(Bet).filter(
@@ -112,13 +124,14 @@ class BetAnalyzer:
                 Bet.status.in_(["won", "lost"])
             ).all()
             
-            bookmakers = set(b.bookmaker for b in bets)
+            # Dispatch each bet to its bookmaker in a single pass
+            for bet in bets:
+                bets_by_bookmaker[bet.bookmaker].append(bet)
             
-            for bookmaker in bookmakers:
-                bm_bets = [b for b in bets if b.bookmaker == bookmaker]
-                stats_by_bookmaker[bookmaker] = self._calculate_stats(bm_bets)
-        
-        return stats_by_bookmaker
+            return {
+                bookmaker: self._calculate_stats(bm_bets)
+                for bookmaker, bm_bets in bets_by_bookmaker.items()
+            }
     
     def _calculate_stats(self, bets: List[Bet]) -> Dict:
         """Calculate statistics for a list of bets.
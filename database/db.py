@@ -2,7 +2,13 @@
 from sqlalchemy import create_engine
 from sqlalchemy.orm import sessionmaker, Session
 from contextlib import contextmanager
-from config.settings import DATABASE_URL
+from config.settings import (
+    DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_POOL_TIMEOUT,
+    DB_POOL_RECYCLE,
+)
 from database.models import Base
 from utils.logger import log
 
@@ -13,11 +19,23 @@ except ImportError:
     pass  # Historical models are optional
 
 
+# Size the connection pool for concurrent API requests; SQLite keeps
+# SQLAlchemy's default pool for its driver
+pool_options = {}
+if not DATABASE_URL.startswith("sqlite"):
+    pool_options = {
+        "pool_size": DB_POOL_SIZE,
+        "max_overflow": DB_MAX_OVERFLOW,
+        "pool_timeout": DB_POOL_TIMEOUT,
+        "pool_recycle": DB_POOL_RECYCLE,
+    }
+
 # Create engine
 engine = create_engine(
     DATABASE_URL,
     echo=False,
     pool_pre_ping=True,
+    **pool_options,
 )
 
 # Create session factory
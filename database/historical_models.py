@@ -1,6 +1,6 @@
 """Historical database models for comprehensive sports betting analysis."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Date, Time
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Date, Time, Index, DDL, event
 from sqlalchemy.orm import relationship
 
 # Import Base from the main models to avoid circular imports
@@ -61,6 +61,10 @@ class NBAGame(Base):
     
     # Relationships
     player_stats = relationship("NBAPlayerGameStats", back_populates="game", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_nba_games_date", game_date.desc()),
+    )
 
 
 class NBAPlayerGameStats(Base):
@@ -119,6 +123,26 @@ class NBAPlayerGameStats(Base):
     
     # Relationship
     game = relationship("NBAGame", back_populates="player_stats")
+    
+    __table_args__ = (
+        Index("ix_nba_player_created", "player_name", created_at.desc()),
+        Index("ix_nba_player_stats_player", "player_id"),
+        # Trigram index so the player search's ILIKE '%name%' avoids a
+        # full scan; PostgreSQL only (needs the pg_trgm extension)
+        Index(
+            "ix_nba_player_name_trgm",
+            "player_name",
+            postgresql_using="gin",
+            postgresql_ops={"player_name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+event.listen(
+    NBAPlayerGameStats.__table__,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
 
 
 class NBATeamStats(Base):
@@ -505,6 +529,32 @@ class EsportsMatch(Base):
     # Relationships
     map_stats = relationship("EsportsMapStats", back_populates="match", cascade="all, delete-orphan")
     player_stats = relationship("EsportsPlayerStats", back_populates="match", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_esports_matches_game_date", "game", match_date.desc()),
+        # Covers the tournaments summary (GROUP BY tournament, game with
+        # MAX(match_date)), so it is answered from the index alone
+        Index("ix_esports_matches_tournament", "tournament", "game", "match_date"),
+        # Dashboard stats only read finished matches; recent results read
+        # them newest first, from the index alone on Postgres
+        Index(
+            "ix_esports_matches_finished",
+            "game",
+            match_date.desc(),
+            postgresql_where=winner.isnot(None),
+            sqlite_where=winner.isnot(None),
+            postgresql_include=[
+                "id", "tournament", "team1", "team2", "team1_score", "team2_score", "winner", "best_of"
+            ],
+        ),
+        # Recent results across all games
+        Index(
+            "ix_esports_matches_finished_date",
+            match_date.desc(),
+            postgresql_where=winner.isnot(None),
+            sqlite_where=winner.isnot(None),
+        ),
+    )
 
 
 class EsportsMapStats(Base):
@@ -590,6 +640,11 @@ class EsportsPlayerStats(Base):
     
     # Relationship
     match = relationship("EsportsMatch", back_populates="player_stats")
+    
+    __table_args__ = (
+        Index("ix_esports_player_stats_team_player", "team", "player_id"),
+        Index("ix_esports_player_stats_player", "player_id"),
+    )
 
 
 class EsportsTeamStats(Base):
@@ -1,6 +1,6 @@
 """Database models using SQLAlchemy."""
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON
+from sqlalchemy import Column, Integer, String, Float, DateTime, Boolean, ForeignKey, Text, JSON, Index
 from sqlalchemy.orm import relationship, declarative_base
 
 Base = declarative_base()
@@ -31,6 +31,10 @@ class Match(Base):
     # Relationships
     odds = relationship("Odds", back_populates="match", cascade="all, delete-orphan")
     bets = relationship("Bet", back_populates="match", cascade="all, delete-orphan")
+    
+    __table_args__ = (
+        Index("ix_matches_game_start", "game", "start_time"),
+    )
 
 
 class Odds(Base):
@@ -57,6 +61,11 @@ class Odds(Base):
     
     # Relationships
     match = relationship("Match", back_populates="odds")
+    
+    __table_args__ = (
+        Index("ix_odds_bookmaker_is_opening", "bookmaker", "is_opening"),
+        Index("ix_odds_match_ts", "match_id", "timestamp"),
+    )
 
 
 class Prediction(Base):
@@ -123,6 +132,12 @@ class Bet(Base):
     
     # Relationship
     match = relationship("Match", back_populates="bets")
+    
+    __table_args__ = (
+        Index("ix_bets_confirmed_status_bookmaker", "confirmed", "status", "bookmaker"),
+        Index("ix_bets_confirmed_status_settled", "confirmed", "status", "settled_at"),
+        Index("ix_bets_match_id_bookmaker", "match_id", "bookmaker"),
+    )
 
 
 class TeamRating(Base):
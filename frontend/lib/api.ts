@@ -171,7 +171,6 @@ export async function getPlayerProps(playerId: string): Promise<PlayerProps> {
 export async function healthCheck(): Promise<{
   status: string;
   timestamp: string;
-  database: string;
   version: string;
 }> {
   return fetchAPI("/api/health");
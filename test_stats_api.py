@@ -0,0 +1,54 @@
+"""Tests for the dashboard stats routes."""
+from datetime import datetime, timedelta
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+from database.historical_models import Base, EsportsMatch
+from api.routes import stats
+
+
+def _session():
+    """Create a session on an empty in-memory historical database."""
+    engine = create_engine(
+        "sqlite://",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    return sessionmaker(bind=engine)()
+
+
+def _add_matches(db, team: str, wins: int, played: int):
+    """Add finished matches of a team against one-off opponents."""
+    start = datetime(2026, 1, 1)
+    for i in range(played):
+        opponent = f"{team}-opponent-{i}"
+        db.add(EsportsMatch(
+            match_id=f"{team}-{i}",
+            game="cs2",
+            match_date=start + timedelta(hours=i),
+            team1=team,
+            team2=opponent,
+            winner=team if i < wins else opponent
+        ))
+
+
+def test_team_stats_rank_ties_on_rounded_win_rate():
+    """Equal rounded win rates are ranked by matches played."""
+    db = _session()
+    # 59/86 and 83/121 both round to a 68.6% win rate; the exact rate of
+    # the 86-match team is higher
+    _add_matches(db, "Fewer", 59, 86)
+    _add_matches(db, "More", 83, 121)
+    db.commit()
+
+    stats._STATS_CACHE.clear()
+    try:
+        result = stats.get_team_stats(game="cs2", limit=1, db=db)
+    finally:
+        stats._STATS_CACHE.clear()
+        db.close()
+
+    assert [team["team"] for team in result] == ["More"]
+    assert result[0]["win_rate"] == 68.6
+    assert result[0]["matches_played"] == 121
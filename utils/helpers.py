@@ -140,16 +140,32 @@ def moving_average(values: List[float], window: int) -> List[float]:
     return list(np.convolve(values, np.ones(window) / window, mode='valid'))
 
 
-def get_streak_info(results: List[bool]) -> dict:
-    """Analyze streak information from results.
+def get_streak_runs(won: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Run-length encode results into streaks.
     
     Args:
-        results: List of boolean results (True = win, False = loss)
+        won: Non-empty boolean array of results (True = win, False = loss)
+        
+    Returns:
+        Tuple of (length of each streak, whether each streak is a win streak)
+    """
+    # Each flip starts a new streak
+    starts = np.concatenate(([0], np.flatnonzero(won[1:] != won[:-1]) + 1))
+    lengths = np.diff(np.append(starts, won.size))
+    return lengths, won[starts]
+
+
+def get_streak_info_from_runs(lengths: np.ndarray, run_won: np.ndarray) -> dict:
+    """Analyze streak information from run-length encoded results.
+    
+    Args:
+        lengths: Length of each streak, in order
+        run_won: Whether each streak is a win streak
         
     Returns:
         Dictionary with streak information
     """
-    if not results:
+    if not lengths.size:
         return {
             "current_streak": 0,
             "current_streak_type": None,
@@ -157,38 +173,29 @@ def get_streak_info(results: List[bool]) -> dict:
             "longest_loss_streak": 0,
         }
     
-    current_streak = 1
-    current_type = results[-1]
-    longest_win = 0
-    longest_loss = 0
-    temp_win = 0
-    temp_loss = 0
-    
-    for result in results:
-        if result:
-            temp_win += 1
-            temp_loss = 0
-            longest_win = max(longest_win, temp_win)
-        else:
-            temp_loss += 1
-            temp_win = 0
-            longest_loss = max(longest_loss, temp_loss)
-    
-    # Count current streak
-    for i in range(len(results) - 1, -1, -1):
-        if results[i] == current_type:
-            current_streak = len(results) - i
-        else:
-            break
-    
     return {
-        "current_streak": current_streak,
-        "current_streak_type": "win" if current_type else "loss",
-        "longest_win_streak": longest_win,
-        "longest_loss_streak": longest_loss,
+        "current_streak": int(lengths[-1]),
+        "current_streak_type": "win" if run_won[-1] else "loss",
+        "longest_win_streak": int(lengths[run_won].max(initial=0)),
+        "longest_loss_streak": int(lengths[~run_won].max(initial=0)),
     }
 
 
+def get_streak_info(results: List[bool]) -> dict:
+    """Analyze streak information from results.
+    
+    Args:
+        results: List of boolean results (True = win, False = loss)
+        
+    Returns:
+        Dictionary with streak information
+    """
+    if not results:
+        return get_streak_info_from_runs(np.empty(0, dtype=int), np.empty(0, dtype=bool))
+    
+    return get_streak_info_from_runs(*get_streak_runs(np.asarray(results, dtype=bool)))
+
+
 def days_between(date1: datetime, date2: datetime) -> int:
     """Calculate days between two dates.
     